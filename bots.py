@@ -1,8 +1,12 @@
 import logging
+import os
 import random
 import time
-import json
+import queue
+from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from dotenv import load_dotenv
 from db_manager import InstagramDataManager
 from bot_manager import BotManager
 from instagrapi import Client
@@ -11,9 +15,10 @@ from instagrapi import Client
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def process_user_reels(username: str, cl: Client, data_manager: InstagramDataManager, reels_to_fetch: int = 48):
+def process_user_reels(username: str, cl: Client, data_manager: InstagramDataManager, reels_to_fetch: int = 48, existing_reels_count: Optional[int] = None):
     """
     Main process for fetching and storing data for a single Instagram user.
+    If the caller already knows the user's stored reel count, pass it as existing_reels_count to skip re-counting.
     """
     logger.info(f"Starting process for user: {username}")
 
@@ -39,7 +44,8 @@ def process_user_reels(username: str, cl: Client, data_manager: InstagramDataMan
     logger.info(f"Successfully upserted info for {user_info.username} (user_pk: {pk})")
 
     # 3. Check for reels and fetch if necessary
-    existing_reels_count = data_manager.count_reels_for_user(pk)
+    if existing_reels_count is None:
+        existing_reels_count = data_manager.count_reels_for_user(pk)
     if existing_reels_count >= reels_to_fetch:
         logger.info(f"Found {existing_reels_count} reels for {username}, which meets the requirement of {reels_to_fetch}. Skipping fetch.")
     else:
@@ -50,9 +56,9 @@ def process_user_reels(username: str, cl: Client, data_manager: InstagramDataMan
         logger.info(f"Fetching {reels_to_fetch} reels for {username}...")
         try:
             reels = cl.user_clips_v1(pk, amount=reels_to_fetch)
-            reels_data = [reel.model_dump(mode='json') for reel in reels]
-            data_manager.save_reels(reels_data, pk)
-            logger.info(f"Successfully saved {len(reels_data)} reels.")
+            # Media models are flattened directly by save_reels, no JSON dump needed
+            data_manager.save_reels(reels, pk)
+            logger.info(f"Successfully saved {len(reels)} reels.")
         except Exception as e:
             logger.error(f"Could not fetch or save reels for {username}: {e}")
             return
@@ -60,34 +66,66 @@ def process_user_reels(username: str, cl: Client, data_manager: InstagramDataMan
     # 4. Get top reels and update the user's account
     top_reels_pks = data_manager.get_top_reels(user_pk=pk, limit=5)
     if top_reels_pks:
-        reels_selected_list_json = json.dumps(top_reels_pks)
-        data_manager.update_account_fields(
-            username=username,
-            reels_selected_list=reels_selected_list_json
-        )
+        data_manager.set_reels_selected(pk, top_reels_pks)
         logger.info(f"Updated account {username} with top {len(top_reels_pks)} reels.")
 
     logger.info(f"Process completed successfully for user: {username}")
     
 
+def process_user_queue(user_queue: queue.Queue, cl: Client, data_manager: InstagramDataManager, reels_to_fetch: int):
+    """
+    Worker loop for a single bot client: takes users off the shared queue and waits a
+    randomized cooldown between users, so cooldowns of different bots overlap.
+    """
+    processed_count = 0
+    while True:
+        try:
+            username, existing_reels_count = user_queue.get_nowait()
+        except queue.Empty:
+            return processed_count
+
+        # If this bot is about to process another user, wait.
+        if processed_count > 0:
+            sleep_time = random.randint(60, 120)
+            logger.info(f"Waiting for {sleep_time} seconds before processing {username}...")
+            time.sleep(sleep_time)
+
+        process_user_reels(
+            username=username,
+            cl=cl,
+            data_manager=data_manager,
+            reels_to_fetch=reels_to_fetch,
+            existing_reels_count=existing_reels_count
+        )
+        processed_count += 1
+
 def main():
     """Main application entry point."""
     logger.info("🚀 Starting Instagram Data Manager...")
     
+    load_dotenv()
     try:
         # Initialize managers
         data_manager = InstagramDataManager()
         bot_manager = BotManager()
         reels_to_fetch = 60 # Configuration for this run
-
-        # Get an authenticated client before processing users
-        logger.info("Attempting to log in with a bot...")
-        cl = bot_manager.get_bot_client(bot_index=0)
-        if not cl:
+        # Number of bot accounts working in parallel, each with its own cooldown and worker thread
+        bots_to_use = max(1, int(os.getenv("POLICY_BOTS_TO_USE", 1)))
+
+        # Get authenticated clients before processing users
+        logger.info(f"Attempting to log in with up to {bots_to_use} bot(s)...")
+        clients = []
+        for bot_index in range(bots_to_use):
+            cl = bot_manager.get_bot_client(bot_index=bot_index)
+            if cl:
+                clients.append(cl)
+            else:
+                logger.warning(f"Login failed for bot {bot_index}.")
+        if not clients:
             logger.error("❌ Login failed. Cannot get an Instagram client. Aborting script.")
             return
         
-        logger.info("✅ Login successful. Starting user processing.")
+        logger.info(f"✅ Logged in with {len(clients)} bot(s). Starting user processing.")
 
         # Ensure database is set up and synced
         sync_success = data_manager.ensure_sync()
@@ -95,42 +133,35 @@ def main():
             logger.error("❌ Failed to start application due to sync issues. Please check CSV data.")
             return
 
-        # Get all usernames from the database
-        usernames = data_manager.get_database_usernames()
-        if not usernames:
+        # Get all users together with their reel counts in a single query
+        users_with_status = data_manager.get_hiker_processing_status_for_all_users()
+        if not users_with_status:
             logger.warning("No usernames found in the database to process.")
             return
         
-        logger.info(f"Found {len(usernames)} users to evaluate.")
+        logger.info(f"Found {len(users_with_status)} users to evaluate.")
         
-        processed_in_session_count = 0
+        user_queue = queue.Queue()
+        for username, user_pk, _, _, existing_reels_count in users_with_status:
+            # Check if user is already processed sufficiently
+            if user_pk and existing_reels_count >= reels_to_fetch:
+                logger.info(f"User {username} already has {existing_reels_count} reels. Skipping.")
+                continue
 
-        for i, username in enumerate(usernames):
-            logger.info(f"--- Evaluating user {i+1}/{len(usernames)}: {username} ---")
+            # Reel counts are only known for users whose insta_id is already stored
+            user_queue.put((username, existing_reels_count if user_pk else None))
 
-            # Check if user is already processed sufficiently
-            user_pk = data_manager.get_user_insta_id(username)
-            if user_pk:
-                existing_reels_count = data_manager.count_reels_for_user(user_pk)
-                if existing_reels_count >= reels_to_fetch:
-                    logger.info(f"User {username} already has {existing_reels_count} reels. Skipping.")
-                    continue
-
-            # If we are about to process a user, and it's not the first one in this session, wait.
-            if processed_in_session_count > 0:
-                sleep_time = random.randint(60, 120)
-                logger.info(f"Waiting for {sleep_time} seconds before processing {username}...")
-                time.sleep(sleep_time)
-
-            process_user_reels(
-                username=username, 
-                cl=cl,
-                data_manager=data_manager,
-                reels_to_fetch=reels_to_fetch
-            )
-            processed_in_session_count += 1
-            
-        logger.info("✅ All users evaluated successfully.")
+        logger.info(f"Queued {user_queue.qsize()} users for processing.")
+
+        # One worker per logged-in bot; each sleeps independently between its own users
+        with ThreadPoolExecutor(max_workers=len(clients)) as executor:
+            futures = [
+                executor.submit(process_user_queue, user_queue, cl, data_manager, reels_to_fetch)
+                for cl in clients
+            ]
+            processed_in_session_count = sum(future.result() for future in futures)
+
+        logger.info(f"✅ All users evaluated successfully. Processed {processed_in_session_count} users this session.")
 
     except Exception as e:
         logger.error(f"❌ An unexpected error occurred in main: {e}")
@@ -2,6 +2,8 @@ import numpy as np
 from collections import defaultdict
 from sklearn.cluster import KMeans
 import umap
+from umap.umap_ import nearest_neighbors
+from numba import njit
 import matplotlib.pyplot as plt
 from db_manager import InstagramDataManager
 import logging
@@ -11,9 +13,17 @@ from sklearn.preprocessing import MinMaxScaler
 from matplotlib.patches import Ellipse
 import matplotlib.transforms as transforms
 import networkx as nx
-import json
 import sqlite3
 import matplotlib.lines as mlines
+import matplotlib.colors as mcolors
+from matplotlib.collections import LineCollection
+
+# Optional GPU backend: RAPIDS cuML exposes the same fit_transform / fit_predict surface as umap-learn, hdbscan and sklearn
+try:
+    import cuml
+    HAS_CUML = True
+except ImportError:
+    HAS_CUML = False
 
 # Suppress warnings
 warnings.filterwarnings('ignore', category=FutureWarning)
@@ -45,8 +55,22 @@ def confidence_ellipse(x, y, ax, n_std=2.0, **kwargs):
     if x.size != y.size:
         raise ValueError("x and y must be the same size")
 
-    cov = np.cov(x, y)
-    pearson = cov[0, 1]/np.sqrt(cov[0, 0] * cov[1, 1])
+    # Compute the 2x2 covariance entries directly rather than through np.cov
+    mean_x = x.mean()
+    mean_y = y.mean()
+    xc = x - mean_x
+    yc = y - mean_y
+    ddof = x.size - 1
+    cov_xx = np.einsum('i,i->', xc, xc) / ddof
+    cov_yy = np.einsum('i,i->', yc, yc) / ddof
+    cov_xy = np.einsum('i,i->', xc, yc) / ddof
+    return _add_ellipse(ax, (mean_x, mean_y), (cov_xx, cov_yy, cov_xy), n_std=n_std, **kwargs)
+
+def _add_ellipse(ax, mean, cov, n_std=2.0, **kwargs):
+    """Add the confidence ellipse for a precomputed mean (x, y) and covariance entries (xx, yy, xy) to *ax*."""
+    mean_x, mean_y = mean
+    cov_xx, cov_yy, cov_xy = cov
+    pearson = cov_xy / np.sqrt(cov_xx * cov_yy)
     
     # Using a special case to obtain the eigenvalues of this
     # two-dimensional dataset.
@@ -56,12 +80,10 @@ def confidence_ellipse(x, y, ax, n_std=2.0, **kwargs):
 
     # Calculating the standard deviation of x from the square root of
     # the variance and multiplying with the given number of standard deviations.
-    scale_x = np.sqrt(cov[0, 0]) * n_std
-    mean_x = np.mean(x)
+    scale_x = np.sqrt(cov_xx) * n_std
 
     # calculating the standard deviation of y ...
-    scale_y = np.sqrt(cov[1, 1]) * n_std
-    mean_y = np.mean(y)
+    scale_y = np.sqrt(cov_yy) * n_std
 
     transf = transforms.Affine2D() \
         .rotate_deg(45) \
@@ -71,7 +93,108 @@ def confidence_ellipse(x, y, ax, n_std=2.0, **kwargs):
     ellipse.set_transform(transf + ax.transData)
     return ax.add_patch(ellipse)
 
-def perform_clustering(creator_profiles, n_clusters=5):
+@njit(cache=True)
+def _cluster_moments(coords, label_idx, n_clusters):
+    """
+    One pass over the points accumulating per-cluster counts and means (Welford-style)
+    plus co-moments, then turning them into sample covariances. label_idx holds each
+    point's cluster index in [0, n_clusters) or -1 for points to skip. The pass is kept
+    serial: prange over points would race on the shared per-cluster accumulators.
+    """
+    counts = np.zeros(n_clusters, dtype=np.int64)
+    means = np.zeros((n_clusters, 2))
+    comoments = np.zeros((n_clusters, 3))
+    for i in range(coords.shape[0]):
+        k = label_idx[i]
+        if k < 0:
+            continue
+        counts[k] += 1
+        dx = coords[i, 0] - means[k, 0]
+        dy = coords[i, 1] - means[k, 1]
+        means[k, 0] += dx / counts[k]
+        means[k, 1] += dy / counts[k]
+        comoments[k, 0] += dx * (coords[i, 0] - means[k, 0])
+        comoments[k, 1] += dy * (coords[i, 1] - means[k, 1])
+        comoments[k, 2] += dx * (coords[i, 1] - means[k, 1])
+    
+    covs = np.full((n_clusters, 3), np.nan)
+    for k in range(n_clusters):
+        if counts[k] == 0:
+            means[k, 0] = np.nan
+            means[k, 1] = np.nan
+        elif counts[k] > 1:
+            for j in range(3):
+                covs[k, j] = comoments[k, j] / (counts[k] - 1)
+    return counts, means, covs
+
+def cluster_covariances(coordinates, labels, cluster_ids):
+    """
+    Per-cluster point counts, means and 2x2 covariance entries for every id in *cluster_ids*,
+    computed by the compiled _cluster_moments kernel in a single pass over the points.
+    
+    Returns
+    -------
+    counts : ndarray, shape (K, )
+    means : ndarray, shape (K, 2)
+        NaN for clusters with no points.
+    covs : ndarray, shape (K, 3)
+        Sample covariance entries (xx, yy, xy); NaN for clusters with fewer than two points.
+    """
+    id_index = {cluster_id: i for i, cluster_id in enumerate(cluster_ids)}
+    label_idx = np.fromiter((id_index.get(label, -1) for label in np.asarray(labels).tolist()), dtype=np.int64, count=len(labels))
+    return _cluster_moments(np.asarray(coordinates, dtype=np.float64), label_idx, len(id_index))
+
+def _stack_profiles(creator_profiles):
+    """Stack creator profile vectors into one preallocated (n_creators, dim) matrix, rows in creator_profiles order."""
+    dim = next(iter(creator_profiles.values())).size
+    # float32 throughout: UMAP, HDBSCAN and KMeans all accept it and it halves memory traffic
+    profile_matrix = np.empty((len(creator_profiles), dim), dtype=np.float32)
+    for i, profile in enumerate(creator_profiles.values()):
+        profile_matrix[i] = profile.ravel()
+    return profile_matrix
+
+def _make_umap(precomputed_knn=(None, None, None), **kwargs):
+    """UMAP reducer on cuML when available, otherwise umap-learn with the shared CPU kNN graph and low_memory."""
+    if HAS_CUML:
+        # cuML builds its own kNN graph on the GPU; output_type keeps results as NumPy arrays
+        return cuml.UMAP(output_type='numpy', **kwargs)
+    return umap.UMAP(low_memory=True, precomputed_knn=precomputed_knn, **kwargs)
+
+def _make_hdbscan(**kwargs):
+    """HDBSCAN clusterer on cuML when available, otherwise the hdbscan package."""
+    if HAS_CUML:
+        return cuml.HDBSCAN(output_type='numpy', **kwargs)
+    # Boruvka over a KD-tree is the fastest MST for the low/medium-dim UMAP embedding; core distances use all cores
+    return hdbscan.HDBSCAN(algorithm='boruvka_kdtree', core_dist_n_jobs=-1, approx_min_span_tree=True, **kwargs)
+
+def _make_kmeans(n_clusters):
+    """K-means estimator on cuML when available, otherwise sklearn."""
+    if HAS_CUML:
+        return cuml.KMeans(n_clusters=n_clusters, random_state=42, output_type='numpy')
+    # sklearn's default Lloyd solver already computes point-to-centroid distances as ||x||^2 + ||c||^2 - 2 x.c
+    # with one BLAS GEMM per chunk, in float32 for our float32 matrix, so no hand-written variant is needed
+    return KMeans(n_clusters=n_clusters, random_state=42, n_init='auto')
+
+def compute_shared_knn(profile_matrix, n_neighbors=15):
+    """
+    Compute the k-nearest-neighbour graph of the profile matrix once, in the
+    (knn_indices, knn_dists, search_index) form accepted by UMAP's precomputed_knn,
+    so the 2-D and 50-D UMAP fits don't each repeat the neighbour search.
+    The NN-descent search runs on all cores (n_jobs=-1); UMAP itself forces a single
+    thread whenever random_state is set, so this is where the parallelism has to come from.
+    """
+    return nearest_neighbors(
+        profile_matrix,
+        n_neighbors=n_neighbors,
+        metric='euclidean',
+        metric_kwds=None,
+        angular=False,
+        random_state=np.random.RandomState(42),
+        low_memory=True,
+        n_jobs=-1
+    )
+
+def perform_clustering(creator_profiles, n_clusters=5, profile_matrix=None):
     """Perform K-means clustering on creator profiles"""
     print(f"\n=== Starting Clustering Analysis (K={n_clusters}) ===")
     
@@ -79,14 +202,15 @@ def perform_clustering(creator_profiles, n_clusters=5):
         print("No creator profiles to cluster")
         return None, None
     
-    # Convert profiles to matrix
+    # Convert profiles to matrix, reusing one stacked by the caller if provided
     user_pks = list(creator_profiles.keys())
-    profile_matrix = np.array([creator_profiles[pk].flatten() for pk in user_pks])  # Flatten to ensure 2D
+    if profile_matrix is None:
+        profile_matrix = _stack_profiles(creator_profiles)
     
     print(f"Profile matrix shape: {profile_matrix.shape}")
     
     # Perform K-means clustering
-    kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init='auto')
+    kmeans = _make_kmeans(n_clusters)
     cluster_labels = kmeans.fit_predict(profile_matrix)
     
     # Create results dictionary
@@ -106,7 +230,7 @@ def perform_clustering(creator_profiles, n_clusters=5):
     
     return clustering_results, kmeans
 
-def perform_hdbscan_clustering(creator_profiles, min_cluster_size=8, min_samples=4, cluster_selection_epsilon=0.0):
+def perform_hdbscan_clustering(creator_profiles, min_cluster_size=8, min_samples=4, cluster_selection_epsilon=0.0, profile_matrix=None, precomputed_knn=(None, None, None)):
     """Perform HDBSCAN clustering on creator profiles with configurable parameters"""
     print(f"\n=== Starting HDBSCAN Clustering Analysis ===")
     print(f"Parameters: min_cluster_size={min_cluster_size}, min_samples={min_samples}, cluster_selection_epsilon={cluster_selection_epsilon}")
@@ -115,19 +239,21 @@ def perform_hdbscan_clustering(creator_profiles, min_cluster_size=8, min_samples
         print("No creator profiles to cluster")
         return None, None
     
-    # Convert profiles to matrix
+    # Convert profiles to matrix, reusing one stacked by the caller if provided
     user_pks = list(creator_profiles.keys())
-    profile_matrix = np.array([creator_profiles[pk].flatten() for pk in user_pks])  # Flatten to ensure 2D
+    if profile_matrix is None:
+        profile_matrix = _stack_profiles(creator_profiles)
     
     print(f"Profile matrix shape: {profile_matrix.shape}")
     
     # Perform HDBSCAN clustering
     # Using UMAP for dimensionality reduction first (HDBSCAN works better with lower dimensions)
-    umap_reducer = umap.UMAP(n_components=50, random_state=42, n_neighbors=15, min_dist=0.1)
-    umap_embedding = umap_reducer.fit_transform(profile_matrix)
+    umap_reducer = _make_umap(precomputed_knn, n_components=50, random_state=42, n_neighbors=15, min_dist=0.1)
+    # C-contiguous float32 so the KD-tree build works on the embedding without copying it
+    umap_embedding = np.ascontiguousarray(umap_reducer.fit_transform(profile_matrix), dtype=np.float32)
     
     # Perform HDBSCAN on UMAP embedding with configurable parameters
-    hdbscan_clusterer = hdbscan.HDBSCAN(
+    hdbscan_clusterer = _make_hdbscan(
         min_cluster_size=min_cluster_size, 
         min_samples=min_samples, 
         metric='euclidean',
@@ -159,7 +285,7 @@ def perform_hdbscan_clustering(creator_profiles, min_cluster_size=8, min_samples
     
     return clustering_results, hdbscan_clusterer
 
-def generate_umap_coordinates(creator_profiles):
+def generate_umap_coordinates(creator_profiles, profile_matrix=None, precomputed_knn=(None, None, None)):
     """Generate UMAP coordinates for creator profiles"""
     print("\n=== Generating UMAP Coordinates ===")
     
@@ -167,17 +293,15 @@ def generate_umap_coordinates(creator_profiles):
         print("No creator profiles to process")
         return None, None
     
-    # Prepare data
+    # Prepare data, reusing a matrix stacked by the caller if provided
     user_pks = list(creator_profiles.keys())
-    profile_matrix = np.array([creator_profiles[pk].flatten() for pk in user_pks])
+    if profile_matrix is None:
+        profile_matrix = _stack_profiles(creator_profiles)
     
     # Generate UMAP coordinates
-    umap_model = umap.UMAP(n_components=2, random_state=42)
+    umap_model = _make_umap(precomputed_knn, n_components=2, random_state=42, n_neighbors=15)
     umap_result = umap_model.fit_transform(profile_matrix)
     
-    # Ensure umap_result is a dense numpy array
-    umap_result = np.asarray(umap_result)
-    
     # Normalize coordinates to [0, 1] range for better storage and visualization
     scaler = MinMaxScaler()
     umap_normalized = scaler.fit_transform(umap_result)
@@ -199,10 +323,10 @@ def visualize_clusters(creator_coordinates, clustering_results, n_clusters=5):
         print("No data to visualize")
         return
     
-    # Prepare data for visualization
-    user_pks = list(creator_coordinates.keys())
-    coordinates = np.array([creator_coordinates[pk] for pk in user_pks])
-    cluster_labels = [clustering_results[pk]['cluster'] for pk in user_pks]
+    # Prepare data for visualization in a single pass over the coordinates
+    user_pks, coords = zip(*creator_coordinates.items())
+    coordinates = np.asarray(coords, dtype=np.float32)
+    cluster_labels = np.fromiter((clustering_results[pk]['cluster'] for pk in user_pks), dtype=np.int32, count=len(user_pks))
     
     # Create UMAP visualization
     fig, ax = plt.subplots(figsize=(14, 12))
@@ -211,11 +335,13 @@ def visualize_clusters(creator_coordinates, clustering_results, n_clusters=5):
     cmap = plt.get_cmap('viridis')
     colors = cmap(np.linspace(0, 1, n_clusters))
     
+    # Means and covariances of every cluster in one pass
+    counts, means, covs = cluster_covariances(coordinates, cluster_labels, range(n_clusters))
+    
     # Plot individual points and add ellipses
     for cluster_id in range(n_clusters):
-        cluster_indices = [i for i, label in enumerate(cluster_labels) if label == cluster_id]
-        if cluster_indices:
-            cluster_coords = coordinates[cluster_indices]
+        if counts[cluster_id]:
+            cluster_coords = coordinates[cluster_labels == cluster_id]
             
             # Plot individual points
             ax.scatter(cluster_coords[:, 0], cluster_coords[:, 1], 
@@ -223,10 +349,10 @@ def visualize_clusters(creator_coordinates, clustering_results, n_clusters=5):
                       label=f'Cluster {cluster_id}' if cluster_id == 0 else "")
             
             # Add confidence ellipse (2 standard deviations)
-            if len(cluster_coords) > 2:  # Need at least 3 points for covariance
-                confidence_ellipse(cluster_coords[:, 0], cluster_coords[:, 1], ax, 
-                                 n_std=2.0, alpha=0.2, color=colors[cluster_id], 
-                                 linewidth=2, linestyle='--')
+            if counts[cluster_id] > 2:  # Need at least 3 points for covariance
+                _add_ellipse(ax, means[cluster_id], covs[cluster_id], 
+                             n_std=2.0, alpha=0.2, color=colors[cluster_id], 
+                             linewidth=2, linestyle='--')
     
     plt.colorbar(plt.cm.ScalarMappable(cmap='viridis'), ax=ax, label='Cluster')
     plt.title('Creator Profiles - K-means Clustering (UMAP) with Ellipses')
@@ -249,25 +375,27 @@ def visualize_hdbscan_clusters(creator_coordinates, hdbscan_results):
         print("No HDBSCAN data to visualize")
         return
     
-    # Prepare data for visualization
-    user_pks = list(creator_coordinates.keys())
-    coordinates = np.array([creator_coordinates[pk] for pk in user_pks])
-    cluster_labels = [hdbscan_results[pk]['cluster'] for pk in user_pks]
-    is_noise = [hdbscan_results[pk]['is_noise'] for pk in user_pks]
+    # Prepare data for visualization in a single pass over the coordinates; noise points carry label -1
+    user_pks, coords = zip(*creator_coordinates.items())
+    coordinates = np.asarray(coords, dtype=np.float32)
+    cluster_labels = np.fromiter((hdbscan_results[pk]['cluster'] for pk in user_pks), dtype=np.int32, count=len(user_pks))
+    is_noise = cluster_labels == -1
     
     # Create UMAP visualization
     fig, ax = plt.subplots(figsize=(16, 14))
     
     # Get non-noise cluster IDs
-    cluster_ids = sorted(set([label for label in cluster_labels if label != -1]))
+    cluster_ids = np.unique(cluster_labels[~is_noise]).tolist()
     cmap = plt.get_cmap('viridis')
     colors = cmap(np.linspace(0, 1, len(cluster_ids)))
     
+    # Means and covariances of every non-noise cluster in one pass
+    counts, means, covs = cluster_covariances(coordinates, cluster_labels, cluster_ids)
+    
     # Plot regular points with cluster colors and add ellipses
     for i, cluster_id in enumerate(cluster_ids):
-        cluster_indices = [j for j, label in enumerate(cluster_labels) if label == cluster_id and not is_noise[j]]
-        if cluster_indices:
-            cluster_coords = coordinates[cluster_indices]
+        if counts[i]:
+            cluster_coords = coordinates[cluster_labels == cluster_id]
             
             # Plot individual points
             ax.scatter(cluster_coords[:, 0], cluster_coords[:, 1], 
@@ -275,15 +403,14 @@ def visualize_hdbscan_clusters(creator_coordinates, hdbscan_results):
                       label=f'Cluster {cluster_id}' if i == 0 else "")
             
             # Add confidence ellipse (2 standard deviations)
-            if len(cluster_coords) > 2:  # Need at least 3 points for covariance
-                confidence_ellipse(cluster_coords[:, 0], cluster_coords[:, 1], ax, 
-                                 n_std=2.0, alpha=0.2, color=colors[i], 
-                                 linewidth=2, linestyle='--')
+            if counts[i] > 2:  # Need at least 3 points for covariance
+                _add_ellipse(ax, means[i], covs[i], 
+                             n_std=2.0, alpha=0.2, color=colors[i], 
+                             linewidth=2, linestyle='--')
     
     # Plot noise points in gray
-    noise_indices = [i for i in range(len(user_pks)) if is_noise[i]]
-    if noise_indices:
-        noise_coordinates = coordinates[noise_indices]
+    if is_noise.any():
+        noise_coordinates = coordinates[is_noise]
         ax.scatter(noise_coordinates[:, 0], noise_coordinates[:, 1], 
                   c='gray', alpha=0.5, s=30, label='Noise points')
     
@@ -300,41 +427,45 @@ def visualize_hdbscan_clusters(creator_coordinates, hdbscan_results):
     print("HDBSCAN visualization saved as:")
     print("- hdbscan_clusters_umap.png")
 
+def _cluster_palette(clustering_results):
+    """Sorted non-noise cluster ids in *clustering_results* and one viridis color per id."""
+    cluster_ids = sorted({data['cluster'] for data in clustering_results.values() if data['cluster'] != -1})
+    colors = plt.get_cmap('viridis')(np.linspace(0, 1, len(cluster_ids)))
+    return cluster_ids, colors
+
 def get_following_network_data(db_manager):
-    """Get following network data from the database"""
+    """
+    Get the following network from the database as a flat list of (follower_id, followed_id) edges.
+    SQLite's json_each expands the stored JSON lists; values that are not valid JSON arrays yield no rows.
+    """
     print("\n=== Getting Following Network Data ===")
     
     try:
         with sqlite3.connect(db_manager.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute("""
-                SELECT insta_id, followed_creators_with_reels_selected_list
-                FROM instagram_accounts 
-                WHERE followed_creators_with_reels_selected_list IS NOT NULL 
-                AND followed_creators_with_reels_selected_list != ''
-                AND umap_x IS NOT NULL 
-                AND umap_y IS NOT NULL
+                SELECT a.insta_id, j.value
+                FROM instagram_accounts a,
+                     json_each(CASE WHEN json_valid(a.followed_creators_with_reels_selected_list)
+                                    THEN CASE WHEN json_type(a.followed_creators_with_reels_selected_list) = 'array'
+                                              THEN a.followed_creators_with_reels_selected_list END
+                               END) j
+                WHERE a.followed_creators_with_reels_selected_list IS NOT NULL 
+                AND a.followed_creators_with_reels_selected_list != ''
+                AND a.umap_x IS NOT NULL 
+                AND a.umap_y IS NOT NULL
             """)
+            following_edges = cursor.fetchall()
             
-            following_data = {}
-            for insta_id, followed_list_json in cursor.fetchall():
-                try:
-                    followed_list = json.loads(followed_list_json)
-                    if isinstance(followed_list, list):
-                        following_data[insta_id] = followed_list
-                except json.JSONDecodeError:
-                    logger.warning(f"Failed to parse JSON for insta_id {insta_id}")
-                    continue
-            
-            print(f"Found following data for {len(following_data)} creators")
-            return following_data
+            print(f"Found {len(following_edges)} following edges")
+            return following_edges
             
     except Exception as e:
         logger.error(f"Error getting following network data: {e}")
-        return {}
+        return []
 
 def visualize_following_network(creator_coordinates, following_data, clustering_results=None):
-    """Visualize the following network with connections between creators"""
+    """Visualize the following network with connections between creators (following_data is a list of (follower_id, followed_id) edges)"""
     print("\n=== Creating Following Network Visualization ===")
     
     if not creator_coordinates or not following_data:
@@ -344,20 +475,18 @@ def visualize_following_network(creator_coordinates, following_data, clustering_
     # Create network graph
     G = nx.DiGraph()
     
-    # Add nodes (creators) with their coordinates
-    for insta_id, coords in creator_coordinates.items():
-        G.add_node(insta_id, pos=coords)
+    # Add nodes (creators) with their coordinates in one bulk call
+    G.add_nodes_from((insta_id, {'pos': coords}) for insta_id, coords in creator_coordinates.items())
     
-    # Add edges (following relationships)
-    edge_count = 0
-    for follower_id, followed_list in following_data.items():
-        if follower_id in creator_coordinates:  # Only include if follower has coordinates
-            for followed_id in followed_list:
-                if followed_id in creator_coordinates:  # Only include if followed has coordinates
-                    G.add_edge(follower_id, followed_id)
-                    edge_count += 1
+    # Add edges (following relationships) where both ends have coordinates; the dict view gives O(1) membership
+    valid = creator_coordinates.keys()
+    G.add_edges_from(
+        (follower_id, followed_id)
+        for follower_id, followed_id in following_data
+        if follower_id in valid and followed_id in valid
+    )
     
-    print(f"Created network with {G.number_of_nodes()} nodes and {edge_count} edges")
+    print(f"Created network with {G.number_of_nodes()} nodes and {G.number_of_edges()} edges")
     
     if G.number_of_nodes() == 0:
         print("No valid network to visualize")
@@ -367,32 +496,35 @@ def visualize_following_network(creator_coordinates, following_data, clustering_
     fig, ax = plt.subplots(figsize=(20, 16))
     
     # Get positions from coordinates
-    pos = {node: creator_coordinates[node] for node in G.nodes()}
+    pos = creator_coordinates
     
     # Draw the network
     if clustering_results:
-        # Color nodes by cluster
-        cluster_ids = sorted(set([data['cluster'] for data in clustering_results.values() if data['cluster'] != -1]))
-        cmap = plt.get_cmap('viridis')
-        colors = cmap(np.linspace(0, 1, len(cluster_ids)))
+        # Color nodes by cluster; the same ids/colors are reused for the legend below
+        cluster_ids, colors = _cluster_palette(clustering_results)
         
-        node_colors = []
-        for node in G.nodes():
-            if node in clustering_results and clustering_results[node]['cluster'] != -1:
-                cluster_id = clustering_results[node]['cluster']
-                color_idx = cluster_ids.index(cluster_id)
-                node_colors.append(colors[color_idx])
-            else:
-                node_colors.append('gray')
-        
-        # Draw nodes with cluster colors
-        nx.draw_networkx_nodes(G, pos, node_color=node_colors, node_size=100, alpha=0.8, ax=ax)
+        # Map each node to its palette index once (-1 for noise/unclustered) and gather colors in one NumPy op
+        cluster_idx = {cluster_id: i for i, cluster_id in enumerate(cluster_ids)}
+        idx = np.fromiter(
+            (cluster_idx.get(clustering_results.get(node, {}).get('cluster', -1), -1) for node in G.nodes()),
+            dtype=np.intp,
+            count=G.number_of_nodes()
+        )
+        # Gray is appended as the last palette row, so index -1 picks it up directly
+        palette = np.vstack([colors.reshape(-1, 4), mcolors.to_rgba('gray')])
+        node_colors = palette[idx]
     else:
         # Draw nodes in default color
-        nx.draw_networkx_nodes(G, pos, node_color='lightblue', node_size=100, alpha=0.8, ax=ax)
+        node_colors = 'lightblue'
+    
+    # Draw nodes as one rasterized scatter
+    node_collection = nx.draw_networkx_nodes(G, pos, node_color=node_colors, node_size=100, alpha=0.8, ax=ax)
+    node_collection.set_rasterized(True)
     
-    # Draw edges with arrows
-    nx.draw_networkx_edges(G, pos, edge_color='gray', alpha=0.3, arrows=True, arrowsize=10, ax=ax)
+    # Draw all edges as a single rasterized LineCollection instead of one FancyArrowPatch per edge
+    if G.number_of_edges():
+        segments = np.array([(pos[u], pos[v]) for u, v in G.edges()], dtype=np.float32)
+        ax.add_collection(LineCollection(segments, colors=(0.5, 0.5, 0.5, 0.3), linewidths=0.5, rasterized=True, zorder=0))
     
     # Add some node labels (for nodes with high degree)
     degrees = dict(G.degree())
@@ -406,13 +538,9 @@ def visualize_following_network(creator_coordinates, following_data, clustering_
     plt.ylabel('UMAP Component 2')
     plt.grid(True, alpha=0.3)
     
-    # Add legend for clusters if available
+    # Add legend for clusters if available, reusing the palette built for the nodes
     if clustering_results:
         legend_elements = []
-        cluster_ids = sorted(set([data['cluster'] for data in clustering_results.values() if data['cluster'] != -1]))
-        cmap = plt.get_cmap('viridis')
-        colors = cmap(np.linspace(0, 1, len(cluster_ids)))
-        
         for i, cluster_id in enumerate(cluster_ids):
             legend_elements.append(mlines.Line2D([0], [0], marker='o', color='w', 
                                             markerfacecolor=colors[i], markersize=10, 
@@ -425,7 +553,7 @@ def visualize_following_network(creator_coordinates, following_data, clustering_
         plt.legend(handles=legend_elements, loc='upper right')
     
     plt.tight_layout()
-    plt.savefig('creator_following_network.png', dpi=300, bbox_inches='tight')
+    plt.savefig('creator_following_network.png', dpi=150, bbox_inches='tight')
     plt.close()
     
     print("Network visualization saved as:")
@@ -463,17 +591,24 @@ def main():
         print("No creator profiles found. Make sure embeddings have been generated.")
         return
     
+    # Stack the profile vectors once; every step below works on the same matrix
+    profile_matrix = _stack_profiles(creator_profiles)
+    # The 2-D and 50-D UMAP fits share the same neighbour graph (UMAP falls back to its own search on tiny inputs)
+    # On the cuML path the GPU builds the graph itself, so the CPU search is skipped
+    use_shared_knn = not HAS_CUML and len(creator_profiles) > 15
+    shared_knn = compute_shared_knn(profile_matrix) if use_shared_knn else (None, None, None)
+    
     # Step 2: Generate UMAP coordinates once and save to database
-    creator_coordinates, umap_result = generate_umap_coordinates(creator_profiles)
+    creator_coordinates, umap_result = generate_umap_coordinates(creator_profiles, profile_matrix=profile_matrix, precomputed_knn=shared_knn)
     if creator_coordinates:
         db_manager.save_umap_coordinates(creator_coordinates)
     
     # Step 3: Perform K-means clustering
     n_clusters = min(5, len(creator_profiles))  # Don't cluster more than we have profiles
-    kmeans_results, kmeans_model = perform_clustering(creator_profiles, n_clusters)
+    kmeans_results, kmeans_model = perform_clustering(creator_profiles, n_clusters, profile_matrix=profile_matrix)
     
     # Step 4: Perform HDBSCAN clustering (using Loose configuration)
-    hdbscan_results, hdbscan_model = perform_hdbscan_clustering(creator_profiles)
+    hdbscan_results, hdbscan_model = perform_hdbscan_clustering(creator_profiles, profile_matrix=profile_matrix, precomputed_knn=shared_knn)
     
     if kmeans_results and creator_coordinates:
         # Step 5: Visualize K-means results
@@ -4,66 +4,118 @@ from huggingface_hub import snapshot_download
 import sqlite3
 import json
 import os
+from itertools import islice
 from dotenv import load_dotenv
-from transformers.utils.quantization_config import BitsAndBytesConfig
 from db_manager import InstagramDataManager
 
 # Load environment variables
 load_dotenv()
 
-# Download model if needed (idempotent)
+# Download model if needed (idempotent).
+# Pre-quantized AWQ INT4 checkpoint: same memory footprint as bnb-nf4, but served by fused W4A16 kernels.
 snapshot_download(
-    repo_id="meta-llama/Llama-3.1-8B-Instruct",
-    local_dir="./Llama-3.1-8B-Instruct",
-    ignore_patterns="original/consolidated.00.pth"
+    repo_id="hugging-quants/Meta-Llama-3.1-8B-Instruct-AWQ-INT4",
+    local_dir="./Meta-Llama-3.1-8B-Instruct-AWQ-INT4"
 )
 
-model_id = "./Llama-3.1-8B-Instruct"
-
-# Singleton for pipeline
-def get_pipeline():
-    if not hasattr(get_pipeline, "_pipeline"):
-        quantization_config = BitsAndBytesConfig(
-            load_in_4bit=True,
-            bnb_4bit_compute_dtype=torch.float16,
-            bnb_4bit_quant_type="nf4",
-            bnb_4bit_use_double_quant=True,
-        )
-        get_pipeline._pipeline = transformers.pipeline(
-            "text-generation",
-            model=model_id,
-            model_kwargs={
-                "torch_dtype": torch.bfloat16,
-                "attn_implementation": "flash_attention_2",
-                "quantization_config": quantization_config,
-            },
+model_id = "./Meta-Llama-3.1-8B-Instruct-AWQ-INT4"
+UPDATE_BATCH_SIZE = 64  # Number of shortened fields buffered before they are written in one commit
+LLM_BATCH_SIZE = 8  # Number of texts sent through the model per generation batch
+
+# Singleton for model and tokenizer
+def get_model():
+    """Load the model and tokenizer once. Generation calls model.generate directly instead of going through a pipeline."""
+    if not hasattr(get_model, "_model"):
+        # Batched generation needs a pad token; decoder-only models must be padded on the left
+        tokenizer = transformers.AutoTokenizer.from_pretrained(model_id, padding_side="left")
+        if tokenizer.pad_token_id is None:
+            tokenizer.pad_token_id = tokenizer.eos_token_id
+        # The AWQ quantization config ships with the checkpoint; its kernels run in float16
+        model = transformers.AutoModelForCausalLM.from_pretrained(
+            model_id,
+            torch_dtype=torch.float16,
+            attn_implementation="flash_attention_2",
             device_map="auto"
         )
-    return get_pipeline._pipeline
+        model.eval()
+        get_model._model = (model, tokenizer)
+    return get_model._model
 
-def shorten_text(text: str) -> str:
-    """Shorten the provided text to max words using the Llama-3.1-8B-Instruct model."""
-    max_words = os.getenv("POLICY_CONCISE_MAX_WORDS", "60")
-    messages = [
+def build_messages(text: str, max_words: str) -> list:
+    return [
         {"role": "system", "content": f"You are a chatbot who shortens the provided text (max {max_words} words). Output only the shortened text."},
         {"role": "user", "content": f"{text}"},
     ]
-    pipeline = get_pipeline()
-    outputs = pipeline(
-        messages,
-        max_new_tokens=256,
-    )
-    # The output from the pipeline is a list containing a dictionary.
-    # The 'generated_text' key in the dictionary contains the full conversation history.
-    # The assistant's response is the last message in that list.
-    full_conversation = outputs[0]["generated_text"]
-    if isinstance(full_conversation, list) and full_conversation:
-        last_message = full_conversation[-1]
-        if isinstance(last_message, dict) and last_message.get("role") == "assistant":
-            return last_message.get("content", "").strip()
-
-    # Fallback for unexpected formats
-    return ""
+
+def shorten_texts(texts: list) -> list:
+    """Shorten a batch of texts to max words in one batched Llama-3.1-8B-Instruct (AWQ) call, preserving order."""
+    max_words = os.getenv("POLICY_CONCISE_MAX_WORDS", "60")
+    model, tokenizer = get_model()
+    inputs = tokenizer.apply_chat_template(
+        [build_messages(text, max_words) for text in texts],
+        add_generation_prompt=True,
+        padding=True,
+        return_tensors="pt",
+        return_dict=True,
+    ).to(model.device)
+    with torch.inference_mode():
+        output_ids = model.generate(
+            **inputs,
+            max_new_tokens=256,
+            do_sample=False,
+            num_beams=1,
+            use_cache=True,
+            pad_token_id=tokenizer.pad_token_id,
+        )
+    # Decode only the newly generated tokens (the prompt is left-padded to a common length)
+    new_tokens = output_ids[:, inputs["input_ids"].shape[1]:]
+    return [reply.strip() for reply in tokenizer.batch_decode(new_tokens, skip_special_tokens=True)]
+
+def shorten_text(text: str) -> str:
+    """Shorten the provided text to max words using the Llama-3.1-8B-Instruct (AWQ) model."""
+    return shorten_texts([text])[0]
+
+def flush_updates(conn, audio_updates: list, caption_updates: list):
+    """Write buffered (short_text, pk) updates with executemany and a single commit, then clear the buffers."""
+    if audio_updates:
+        conn.executemany("UPDATE reels SET audio_content_short = ? WHERE pk = ?", audio_updates)
+    if caption_updates:
+        conn.executemany("UPDATE reels SET caption_english_short = ? WHERE pk = ?", caption_updates)
+    conn.commit()
+    audio_updates.clear()
+    caption_updates.clear()
+
+def _sql_word_count(column: str) -> str:
+    """
+    SQL expression approximating len(column.split()): newlines, carriage returns and tabs are
+    turned into spaces, then the spaces of the trimmed text are counted plus one. Runs of
+    consecutive whitespace count once per character, so the result never undercounts split()
+    and is only used to prefilter rows.
+    """
+    text = f"trim(replace(replace(replace({column}, char(10), ' '), char(13), ' '), char(9), ' '))"
+    return f"length({text}) - length(replace({text}, ' ', '')) + 1"
+
+def iter_candidates(cur, max_words_policy: int):
+    """
+    Stream (pk, field, text) for every field that needs shortening straight off the SELECT cursor.
+    The SQL word counts only prefilter rows; the exact split() count decides what gets queued.
+    """
+    for reel in cur:
+        pk = reel['pk']
+
+        # Process audio_content
+        if reel['audio_words'] > max_words_policy:
+            audio_words = len(reel['audio_content'].split())
+            if audio_words > max_words_policy:
+                print(f"  Queued audio_content for reel {pk} ({audio_words} words)")
+                yield pk, 'audio', reel['audio_content']
+
+        # Process caption_english
+        if reel['caption_words'] > max_words_policy:
+            caption_words = len(reel['caption_english'].split())
+            if caption_words > max_words_policy:
+                print(f"  Queued caption_english for reel {pk} ({caption_words} words)")
+                yield pk, 'caption', reel['caption_english']
 
 def main():
     max_words_policy = int(os.getenv("POLICY_CONCISE_MAX_WORDS", "60"))
@@ -77,53 +129,73 @@ def main():
 
     print(f"Found {len(selected_pks)} unique selected reels to process.")
 
-    # 2. Get the data for these reels in one go
+    # 2. Stream the data for these reels. Rows are read on one connection and updates are
+    # written on a second one, so commits never interfere with the open SELECT cursor.
     conn = sqlite3.connect(data_manager.db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
     conn.row_factory = sqlite3.Row
+    write_conn = sqlite3.connect(data_manager.db_path)
+    write_conn.execute("PRAGMA synchronous=NORMAL")
     cur = conn.cursor()
+    cur.arraysize = 256
+
+    # The selected PKs go into a connection-local temp table (same TEXT type as reels.pk) instead of
+    # a giant IN (?, ?, ...) list, which stays within SQLite's parameter limit and compiles once
+    conn.execute("CREATE TEMP TABLE tmp_pks (pk TEXT PRIMARY KEY)")
+    conn.executemany("INSERT OR IGNORE INTO tmp_pks VALUES (?)", ((pk,) for pk in selected_pks))
+    conn.commit()
 
-    placeholders = ','.join('?' for _ in selected_pks)
+    # Only reels with a field that still needs shortening leave the database. Word counts are
+    # computed in SQLite and compared to the policy there; see _sql_word_count.
     query = f"""
-        SELECT pk, audio_content, audio_type, caption_english, audio_content_short, caption_english_short
-        FROM reels
-        WHERE pk IN ({placeholders})
+        SELECT pk, audio_content, caption_english, audio_words, caption_words
+        FROM (
+            SELECT pk, audio_content, caption_english,
+                CASE WHEN audio_type = 'speech' AND audio_content IS NOT NULL AND audio_content != ''
+                          AND (audio_content_short IS NULL OR trim(audio_content_short) = '')
+                     THEN {_sql_word_count('audio_content')}
+                     ELSE 0 END AS audio_words,
+                CASE WHEN caption_english IS NOT NULL AND caption_english != ''
+                          AND (caption_english_short IS NULL OR trim(caption_english_short) = '')
+                     THEN {_sql_word_count('caption_english')}
+                     ELSE 0 END AS caption_words
+            FROM reels
+            WHERE pk IN (SELECT pk FROM tmp_pks)
+        )
+        WHERE audio_words > ? OR caption_words > ?
     """
-    cur.execute(query, selected_pks)
-    reels_to_process = cur.fetchall()
+    cur.execute(query, (max_words_policy, max_words_policy))
 
     processed_audio = 0
     processed_caption = 0
-
-    # 3. Iterate and process
-    for reel in reels_to_process:
-        pk = reel['pk']
-
-        # Process audio_content
-        audio_content = reel['audio_content']
-        audio_type = reel['audio_type']
-        audio_content_short = reel['audio_content_short']
-
-        if audio_type == 'speech' and audio_content and not (audio_content_short and audio_content_short.strip()):
-            if len(audio_content.split()) > max_words_policy:
-                print(f"  Shortening audio_content for reel {pk} ({len(audio_content.split())} words)...")
-                short_audio = shorten_text(audio_content)
-                cur.execute("UPDATE reels SET audio_content_short = ? WHERE pk = ?", (short_audio, pk))
-                processed_audio += 1
-                conn.commit()
-
-        # Process caption_english
-        caption_english = reel['caption_english']
-        caption_english_short = reel['caption_english_short']
-
-        if caption_english and not (caption_english_short and caption_english_short.strip()):
-             if len(caption_english.split()) > max_words_policy:
-                print(f"  Shortening caption_english for reel {pk} ({len(caption_english.split())} words)...")
-                short_caption = shorten_text(caption_english)
-                cur.execute("UPDATE reels SET caption_english_short = ? WHERE pk = ?", (short_caption, pk))
-                processed_caption += 1
-                conn.commit()
+    audio_updates = []
+    caption_updates = []
+
+    # 3. Pull (pk, field, text) candidates off the cursor one model batch at a time, buffering
+    # updates so they are committed in batches
+    candidates = iter_candidates(cur, max_words_policy)
+    done = 0
+    try:
+        while batch := list(islice(candidates, LLM_BATCH_SIZE)):
+            print(f"  Shortening fields {done + 1}-{done + len(batch)}...")
+            shortened = shorten_texts([text for _, _, text in batch])
+            done += len(batch)
+            for (pk, field, _), short_text in zip(batch, shortened):
+                if field == 'audio':
+                    audio_updates.append((short_text, pk))
+                    processed_audio += 1
+                else:
+                    caption_updates.append((short_text, pk))
+                    processed_caption += 1
+
+            if len(audio_updates) + len(caption_updates) >= UPDATE_BATCH_SIZE:
+                flush_updates(write_conn, audio_updates, caption_updates)
+    finally:
+        # Persist whatever was shortened before an interruption
+        flush_updates(write_conn, audio_updates, caption_updates)
 
     print(f"Done. Shortened {processed_audio} audio_content and {processed_caption} caption_english fields.")
+    write_conn.close()
     conn.close()
 
 if __name__ == "__main__":
@@ -1,29 +1,194 @@
 import sqlite3
-import pandas as pd
 import os
-from typing import List, Tuple, Optional
+from typing import Iterator, List, Tuple, Optional
 import logging
 from datetime import datetime
 import json
 import numpy as np
 from collections import defaultdict
+from contextlib import contextmanager
+from functools import lru_cache
+import threading
+from itertools import chain, groupby, islice
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Hot per-reel / per-user statements, kept as constants so every call reuses the same prepared statement
+SQL_GET_INSTA_ID = "SELECT insta_id FROM instagram_accounts WHERE username = ?"
+SQL_COUNT_REELS_FOR_USER = "SELECT COUNT(*) FROM reels WHERE user_pk = ?"
+SQL_MARK_REEL_DOWNLOADED = "UPDATE reels SET downloaded = 1 WHERE pk = ?"
+SQL_IS_REEL_DOWNLOADED = "SELECT downloaded FROM reels WHERE pk = ?"
+SQL_GET_REEL_VIDEO_URL = "SELECT video_url FROM reels WHERE pk = ?"
+SQL_GET_REEL_THUMBNAIL_URL = "SELECT thumbnail_url FROM reels WHERE pk = ?"
+SQL_MARK_REEL_UNAVAILABLE = "UPDATE reels SET video_unavailable = 1 WHERE pk = ?"
+SQL_IS_REEL_UNAVAILABLE = "SELECT video_unavailable FROM reels WHERE pk = ?"
+SQL_SET_NO_AUDIO = "UPDATE reels SET no_audio = 1 WHERE pk = ?"
+SQL_SET_AUDIO_INFO = "UPDATE reels SET audio_type = ?, audio_content = ? WHERE pk = ?"
+SQL_SET_CAPTION_ENGLISH = "UPDATE reels SET caption_english = ? WHERE pk = ?"
+SQL_MARK_NO_AUDIO_CLEAR_TYPE = "UPDATE reels SET no_audio = 1, audio_type = '' WHERE pk = ?"
+SQL_SET_MODEL_DESCRIPTION = "UPDATE reels SET model_description_text = ? WHERE pk = ?"
+SQL_SAVE_EMBEDDING = "UPDATE reels SET model_description_embeddings = ? WHERE pk = ?"
+SQL_SAVE_PROCESSED_DESCRIPTION = "UPDATE reels SET model_description_processed = ? WHERE pk = ?"
+SQL_GET_REEL_INFO = """
+    SELECT pk, user_pk, code, caption, caption_english, caption_english_short,
+           audio_type, audio_content, audio_content_short, video_url
+    FROM reels
+    WHERE pk = ?
+"""
+
+# Column order of upsert_account's INSERT; its values must be passed in the same order
+ACCOUNT_UPSERT_COLUMNS = (
+    'username', 'insta_id', 'follower_count', 'following_count', 'full_name', 'url',
+    'profile_pic_url', 'biography', 'city_name', 'followers_list', 'following_list',
+    'reels_list', 'reels_selected_list', 'aesthetic_profile_text', 'aesthetic_profile_embedding'
+)
+SQL_UPSERT_ACCOUNT = f"""
+    INSERT INTO instagram_accounts ({', '.join(ACCOUNT_UPSERT_COLUMNS)})
+    VALUES ({', '.join(['?'] * len(ACCOUNT_UPSERT_COLUMNS))})
+    ON CONFLICT(username) DO UPDATE SET
+        {', '.join(f"{column} = excluded.{column}" for column in ACCOUNT_UPSERT_COLUMNS[1:])},
+        updated_at = CURRENT_TIMESTAMP
+"""
+
+def _chunks(seq, n):
+    """Yield consecutive slices of seq with at most n items each."""
+    for i in range(0, len(seq), n):
+        yield seq[i:i + n]
+
+# SQLite's historical default bound-parameter limit (SQLITE_MAX_VARIABLE_NUMBER), safe on every build
+MAX_BOUND_PARAMS = 999
+
+def _execute_multirow(cursor, head: str, rows: list, tail: str = "") -> int:
+    """
+    Run head + "VALUES (?, ...), (?, ...), ..." + tail over rows, packing as many rows into each
+    statement as MAX_BOUND_PARAMS allows. Returns the total number of affected rows.
+    """
+    if not rows:
+        return 0
+    n_cols = len(rows[0])
+    row_placeholder = "(" + ", ".join("?" * n_cols) + ")"
+    affected = 0
+    for chunk in _chunks(rows, MAX_BOUND_PARAMS // n_cols):
+        values = ", ".join([row_placeholder] * len(chunk))
+        cursor.execute(f"{head} VALUES {values} {tail}", list(chain.from_iterable(chunk)))
+        affected += cursor.rowcount
+    return affected
+
+# Embeddings are stored as raw packed float16 bytes (half the size of float32, no pickling or JSON);
+# the dimension is implied by the blob length
+EMBEDDING_DTYPE = np.float16
+
+def _emb_to_blob(embedding: np.ndarray) -> bytes:
+    """Pack an embedding as raw EMBEDDING_DTYPE bytes."""
+    return np.asarray(embedding).astype(EMBEDDING_DTYPE, copy=False).tobytes()
+
+def _blob_to_emb(blob: bytes) -> np.ndarray:
+    """Unpack a blob written by _emb_to_blob into a flat (read-only) array without copying."""
+    return np.frombuffer(blob, dtype=EMBEDDING_DTYPE)
+
+def _selected_pks_sql(column: str) -> str:
+    """json_each source over a reels_selected_list column that yields nothing unless it holds a valid JSON array."""
+    return (f"json_each(CASE WHEN json_valid({column}) THEN "
+            f"CASE WHEN json_type({column}) = 'array' THEN {column} END END)")
+
+# Account writes that refresh the reels_selected rows of the written account
+REELS_SELECTED_TRIGGER_EVENTS = ("INSERT", "UPDATE OF reels_selected_list")
+
+def _reels_selected_trigger_sql(event: str) -> Tuple[str, str]:
+    """Name and CREATE TRIGGER statement mirroring reels_selected_list into reels_selected after the given event."""
+    trigger = "trg_reels_selected_" + event.split()[0].lower()
+    # JSON nulls come out of json_each as SQL NULL, which reels_selected.pk rejects; skip them
+    return trigger, f'''
+        CREATE TRIGGER IF NOT EXISTS {trigger} AFTER {event} ON instagram_accounts
+        BEGIN
+            DELETE FROM reels_selected WHERE account_id = NEW.id;
+            INSERT INTO reels_selected (account_id, rank, pk)
+            SELECT NEW.id, key, value FROM {_selected_pks_sql('NEW.reels_selected_list')}
+            WHERE type != 'null';
+        END
+    '''
+
+# Columns update_account_fields / update_accounts_bulk may set; the flags are stored as 0/1
+ACCOUNT_UPDATE_FIELDS = ('follower_count', 'following_count', 'reels_list', 'reels_selected_list', 'insta_id', 'all_reels_fetched_hiker', 'all_following_fetched_hiker')
+ACCOUNT_FLAG_FIELDS = ('all_reels_fetched_hiker', 'all_following_fetched_hiker')
+
+@lru_cache(maxsize=None)
+def _account_update_sql(fields: tuple) -> str:
+    """UPDATE statement for a sorted tuple of account fields, built once per shape so the prepared statement is reused."""
+    assignments = ', '.join(f"{field} = ?" for field in fields)
+    return f"UPDATE instagram_accounts SET {assignments}, updated_at = CURRENT_TIMESTAMP WHERE username = ?"
+
+def _account_update_params(row: dict) -> Tuple[tuple, list]:
+    """Split a row dict into its sorted tuple of non-None fields and the matching parameters (username last)."""
+    fields = tuple(sorted(k for k in ACCOUNT_UPDATE_FIELDS if row.get(k) is not None))
+    params = [(1 if row[k] else 0) if k in ACCOUNT_FLAG_FIELDS else row[k] for k in fields]
+    params.append(row['username'])
+    return fields, params
+
 class InstagramDataManager:
+    # Bumped whenever migrate_schema gains a step; stored in PRAGMA user_version once applied
+    SCHEMA_VERSION = 9
+
     def __init__(self, db_path: str = "data/instagram_data.db", csv_path: str = "data/data.csv"):
         self.db_path = db_path
         self.csv_path = csv_path
+        # One long-lived connection shared by every method; the lock serializes access across threads
+        self._conn = None
+        self._lock = threading.RLock()
+        # In-process caches for hot point reads. Only facts that do not flip back are cached: positive
+        # downloaded/unavailable flags (cleared when reels are deleted) and known insta_ids (dropped
+        # whenever an account write may change them). Reel URLs are not cached, save_reels refreshes them.
+        self._downloaded_pks = set()
+        self._unavailable_pks = set()
+        self._insta_ids = {}
         self.init_database()
         self.migrate_schema()
     
+    @contextmanager
+    def _connect(self):
+        """
+        Borrow the manager's long-lived connection, opening it (with the per-connection PRAGMAs) on first use.
+        Commits on success and rolls back on error, like sqlite3's own context manager. WAL itself is
+        persisted in the file by init_database.
+        """
+        with self._lock:
+            if self._conn is None:
+                # The connection lives as long as the manager, so a larger statement cache keeps every
+                # method's SQL prepared across calls instead of re-parsing it
+                self._conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=512)
+                self._conn.executescript(
+                    "PRAGMA synchronous=NORMAL;"
+                    "PRAGMA temp_store=MEMORY;"
+                    "PRAGMA cache_size=-131072;"
+                    "PRAGMA mmap_size=268435456;"
+                )
+            with self._conn:
+                yield self._conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """Close the manager's connection; the next call reopens it."""
+        with self._lock:
+            if self._conn is not None:
+                # SQLite recommends optimize right before closing long-lived connections
+                self._conn.execute("PRAGMA optimize")
+                self._conn.close()
+                self._conn = None
+
     def init_database(self):
         """Initialize the SQLite database with the required table structure."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
+                # WAL lets readers and the writer proceed concurrently; the mode sticks to the database file
+                cursor.execute("PRAGMA journal_mode=WAL")
                 cursor.execute('''
                     CREATE TABLE IF NOT EXISTS instagram_accounts (
                         id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -41,7 +206,7 @@ class InstagramDataManager:
                         reels_list TEXT,
                         reels_selected_list TEXT,
                         aesthetic_profile_text TEXT,
-                        aesthetic_profile_embedding TEXT,
+                        aesthetic_profile_embedding BLOB,
                         all_reels_fetched_hiker INTEGER DEFAULT 0,
                         all_following_fetched_hiker INTEGER DEFAULT 0,
                         created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -94,6 +259,31 @@ class InstagramDataManager:
                         UNIQUE(user_pk, following_pk)
                     )
                 ''')
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS meta (
+                        key TEXT PRIMARY KEY,
+                        value TEXT
+                    )
+                ''')
+                # Normalized copy of instagram_accounts.reels_selected_list (one row per selected reel, in list
+                # order), kept current by triggers so every writer of the JSON column stays unchanged while
+                # readers get the selected pks with plain SQL instead of parsing every list in Python
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS reels_selected (
+                        account_id INTEGER NOT NULL,
+                        rank INTEGER NOT NULL,
+                        pk TEXT NOT NULL,
+                        PRIMARY KEY (account_id, rank)
+                    ) WITHOUT ROWID
+                ''')
+                for event in REELS_SELECTED_TRIGGER_EVENTS:
+                    cursor.execute(_reels_selected_trigger_sql(event)[1])
+                cursor.execute('''
+                    CREATE TRIGGER IF NOT EXISTS trg_reels_selected_delete AFTER DELETE ON instagram_accounts
+                    BEGIN
+                        DELETE FROM reels_selected WHERE account_id = OLD.id;
+                    END
+                ''')
                 cursor.execute('''
                     CREATE TABLE IF NOT EXISTS requests (
                         id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -111,15 +301,90 @@ class InstagramDataManager:
     def migrate_schema(self):
         """Ensure all required columns exist and migrate usernames if needed."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
-                # Ensure username is unique, useful for older DBs.
-                cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_username_unique ON instagram_accounts(username)")
+                # Already-migrated databases are recognised by a single integer pragma
+                version = cursor.execute("PRAGMA user_version").fetchone()[0]
+                if version >= self.SCHEMA_VERSION:
+                    return
+                # Current tables declare username UNIQUE, whose automatic index (origin 'u') already enforces it
+                username_constrained = any(
+                    origin == 'u' and [info[2] for info in cursor.execute(f"PRAGMA index_info({name})").fetchall()] == ['username']
+                    for _, name, _, origin, _ in cursor.execute("PRAGMA index_list(instagram_accounts)").fetchall()
+                )
+                if version < 1 and not username_constrained:
+                    # Ensure username is unique, useful for older DBs whose table lacks the constraint.
+                    # id is the INTEGER PRIMARY KEY (the rowid), which every index entry already stores,
+                    # so this index is covering for (username, id) lookups without a separate composite index.
+                    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_username_unique ON instagram_accounts(username)")
+                if version < 2:
+                    # Per-user reel counts, deletes and top-N by plays become index range scans.
+                    # Its user_pk prefix also serves plain user_pk filters, and following is already
+                    # indexed on user_pk by its UNIQUE(user_pk, following_pk) constraint.
+                    cursor.execute("CREATE INDEX IF NOT EXISTS idx_reels_user_play ON reels(user_pk, play_count DESC)")
+                if version < 3:
+                    # play_count has INTEGER affinity, so only legacy values that could not be converted
+                    # are stored as text/real; normalise them so ORDER BY play_count matches the old CAST
+                    cursor.execute("""
+                        UPDATE reels SET play_count = CAST(play_count AS INTEGER)
+                        WHERE play_count IS NOT NULL AND typeof(play_count) != 'integer'
+                    """)
+                if version < 4:
+                    # Repack embeddings as float16: reel blobs were raw float32 bytes, account
+                    # embeddings were JSON text (SQLite keeps the old TEXT declaration, which stores blobs as-is)
+                    cursor.execute("SELECT pk, model_description_embeddings FROM reels WHERE typeof(model_description_embeddings) = 'blob'")
+                    cursor.executemany(
+                        "UPDATE reels SET model_description_embeddings = ? WHERE pk = ?",
+                        [(_emb_to_blob(np.frombuffer(blob, dtype=np.float32)), pk) for pk, blob in cursor.fetchall()]
+                    )
+                    cursor.execute("""
+                        SELECT id, aesthetic_profile_embedding FROM instagram_accounts
+                        WHERE typeof(aesthetic_profile_embedding) = 'text' AND json_valid(aesthetic_profile_embedding)
+                    """)
+                    cursor.executemany(
+                        "UPDATE instagram_accounts SET aesthetic_profile_embedding = ? WHERE id = ?",
+                        [(_emb_to_blob(json.loads(text)), account_id) for account_id, text in cursor.fetchall()]
+                    )
+                if version < 5 and username_constrained:
+                    # A second unique index on the same column only doubles the B-tree work of every account write
+                    cursor.execute("DROP INDEX IF EXISTS idx_username_unique")
+                if version < 6:
+                    # Backfill reels_selected from lists written before its triggers existed
+                    cursor.execute(f"""
+                        INSERT OR REPLACE INTO reels_selected (account_id, rank, pk)
+                        SELECT ia.id, j.key, j.value
+                        FROM instagram_accounts ia, {_selected_pks_sql('ia.reels_selected_list')} j
+                        WHERE j.type != 'null'
+                    """)
+                if version < 7:
+                    # set_caption_english used to add this column lazily on every call; check it once here
+                    if 'caption_english' not in [row[1] for row in cursor.execute("PRAGMA table_info(reels)").fetchall()]:
+                        cursor.execute("ALTER TABLE reels ADD COLUMN caption_english TEXT")
+                if version < 8:
+                    # set_reels_selected and the bulk cluster/UMAP/backfill writers update accounts by insta_id
+                    cursor.execute("CREATE INDEX IF NOT EXISTS idx_accounts_insta_id ON instagram_accounts(insta_id)")
+                if version < 9:
+                    # Recreate the reels_selected triggers of older databases so they skip JSON null elements
+                    for event in REELS_SELECTED_TRIGGER_EVENTS:
+                        trigger, create_sql = _reels_selected_trigger_sql(event)
+                        cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+                        cursor.execute(create_sql)
+                cursor.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
                 conn.commit()
+                # Collect statistics once so the planner knows about the new indexes
+                cursor.execute("ANALYZE")
         except Exception as e:
             logger.error(f"Error migrating database schema: {e}")
             raise
     
+    def iter_csv_usernames(self):
+        """Lazily yield the username of every CSV line (not deduplicated); blank lines and URLs without a username are skipped."""
+        with open(self.csv_path, 'r', buffering=1 << 20) as f:
+            # Each line is stripped once; the blank-line check reuses the stripped URL
+            for url in map(str.strip, (line.partition(',')[0] for line in f)):
+                if url and (username := url.rstrip('/').rsplit('/', 1)[-1]):
+                    yield username
+
     def read_csv_data(self) -> List[str]:
         """Read Instagram usernames from the CSV file, deduplicated."""
         try:
@@ -127,85 +392,119 @@ class InstagramDataManager:
                 logger.warning(f"CSV file {self.csv_path} not found")
                 return []
             
-            df = pd.read_csv(self.csv_path, header=None)
-            urls = df[0].drop_duplicates().tolist()  # Deduplicate URLs
-            usernames = [self.extract_username_from_url(url) for url in urls]
-            usernames = list(dict.fromkeys(usernames))  # Remove duplicates, preserve order
+            # Usernames are deduplicated once, after extraction (different URLs can name the same user),
+            # with dict.fromkeys rather than set() because it keeps the CSV order.
+            usernames = list(dict.fromkeys(self.iter_csv_usernames()))
             logger.info(f"Read {len(usernames)} unique usernames from CSV file")
             return usernames
         except Exception as e:
             logger.error(f"Error reading CSV file: {e}")
             return []
     
+    def iter_database_usernames(self, batch_size: int = 1000) -> Iterator[str]:
+        """Lazily yield every username in the database, fetched batch_size rows at a time."""
+        last_id = 0
+        while True:
+            # Each batch is a keyset page read under the connection lock, which is released again
+            # before the usernames are yielded, so a slow consumer never blocks other callers
+            with self._connect() as conn:
+                rows = conn.execute(
+                    "SELECT id, username FROM instagram_accounts WHERE id > ? ORDER BY id LIMIT ?",
+                    (last_id, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            for _, username in rows:
+                yield username
+
     def get_database_usernames(self) -> List[str]:
         """Get all usernames from the database."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT username FROM instagram_accounts")
-                usernames = [row[0] for row in cursor.fetchall()]
-                logger.info(f"Retrieved {len(usernames)} usernames from database")
-                return usernames
+            usernames = list(self.iter_database_usernames())
+            logger.info(f"Retrieved {len(usernames)} usernames from database")
+            return usernames
         except Exception as e:
             logger.error(f"Error reading from database: {e}")
             return []
     
     def extract_username_from_url(self, url: str) -> str:
         """Extract username from Instagram URL."""
-        try:
-            username = url.rstrip('/').split('/')[-1]
-            return username
-        except Exception:
-            return ""
+        # rsplit with maxsplit=1 stops at the last separator instead of splitting the whole URL
+        return url.rstrip('/').rsplit('/', 1)[-1] if url else ""
     
-    def sync_csv_to_database(self):
+    def sync_csv_to_database(self, chunk_size: int = 10_000):
         """Sync CSV data to the database, adding new usernames and updating existing ones."""
         try:
-            csv_usernames = self.read_csv_data()
-            if not csv_usernames:
-                logger.warning("No usernames found in CSV file")
+            if not os.path.exists(self.csv_path):
+                logger.warning(f"CSV file {self.csv_path} not found")
                 return
 
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT username FROM instagram_accounts")
-                existing_usernames = {row[0] for row in cursor.fetchall()}
-
-                # Filter out empty strings and users that already exist.
-                new_usernames = [
-                    (user,) for user in csv_usernames 
-                    if user and user not in existing_usernames
-                ]
+            # The CSV is streamed, so memory stays bounded however large the file is
+            read_count, inserted = self._insert_new_usernames(self.iter_csv_usernames(), chunk_size)
 
-                if new_usernames:
-                    cursor.executemany(
-                        "INSERT OR IGNORE INTO instagram_accounts (username) VALUES (?)",
-                        new_usernames
-                    )
-                    logger.info(f"Committed {len(new_usernames)} new usernames to the database.")
-                else:
-                    logger.info("Database is already up to date with CSV data.")
+            if not read_count:
+                logger.warning("No usernames found in CSV file")
+            elif inserted > 0:
+                logger.info(f"Committed {inserted} new usernames to the database.")
+            else:
+                logger.info("Database is already up to date with CSV data.")
         except Exception as e:
             logger.error(f"Error syncing CSV to database: {e}")
             raise
     
+    def _insert_new_usernames(self, usernames, chunk_size: int = 10_000) -> Tuple[int, int]:
+        """
+        Insert usernames from any iterable in fixed-size chunks. Returns (read_count, inserted).
+        No Python-side dedup is needed: duplicates and existing usernames are skipped by the UNIQUE
+        username index via INSERT OR IGNORE. Each chunk is bound as one JSON array and
+        expanded by json_each, so SQLite ingests it in C; all chunks share one transaction.
+        """
+        usernames = iter(usernames)
+        read_count = 0
+        inserted = 0
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            if not conn.in_transaction:
+                conn.execute("BEGIN IMMEDIATE")
+            while chunk := list(islice(usernames, chunk_size)):
+                read_count += len(chunk)
+                cursor.execute(
+                    "INSERT OR IGNORE INTO instagram_accounts (username) "
+                    "SELECT value FROM json_each(?) WHERE value != ''",
+                    (json.dumps(chunk),)
+                )
+                inserted += cursor.rowcount
+        return read_count, inserted
+
     def check_sync_status(self) -> Tuple[bool, dict]:
         """
         Check if CSV and database are in sync.
         Returns (is_sync, sync_info)
         """
         try:
-            csv_usernames = set(self.read_csv_data())
-            db_usernames = set(self.get_database_usernames())
-            csv_only = csv_usernames - db_usernames
-            db_only = db_usernames - csv_usernames
+            csv_usernames = self.read_csv_data()
+            # Diff in SQL against a temp table of CSV usernames, so only the differing rows come back to Python
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                cursor.execute("CREATE TEMP TABLE IF NOT EXISTS csv_usernames (username TEXT PRIMARY KEY)")
+                cursor.execute("DELETE FROM temp.csv_usernames")
+                cursor.executemany("INSERT OR IGNORE INTO temp.csv_usernames VALUES (?)", ((user,) for user in csv_usernames))
+                csv_only = [row[0] for row in cursor.execute(
+                    "SELECT username FROM temp.csv_usernames EXCEPT SELECT username FROM instagram_accounts"
+                )]
+                db_only = [row[0] for row in cursor.execute(
+                    "SELECT username FROM instagram_accounts EXCEPT SELECT username FROM temp.csv_usernames"
+                )]
+                db_count = cursor.execute("SELECT COUNT(*) FROM instagram_accounts").fetchone()[0]
+                cursor.execute("DROP TABLE temp.csv_usernames")
             is_sync = len(csv_only) == 0 and len(db_only) == 0
             sync_info = {
                 'is_sync': is_sync,
                 'csv_count': len(csv_usernames),
-                'db_count': len(db_usernames),
-                'csv_only': list(csv_only),
-                'db_only': list(db_only),
+                'db_count': db_count,
+                'csv_only': csv_only,
+                'db_only': db_only,
                 'total_differences': len(csv_only) + len(db_only)
             }
             return is_sync, sync_info
@@ -213,9 +512,34 @@ class InstagramDataManager:
             logger.error(f"Error checking sync status: {e}")
             return False, {'error': str(e)}
     
+    def _sync_fingerprint(self) -> Optional[str]:
+        """Fingerprint of the CSV file (mtime, size) and the accounts table (row count, max id, max updated_at)."""
+        if not os.path.exists(self.csv_path):
+            return None
+        stat = os.stat(self.csv_path)
+        with self._connect() as conn:
+            db_state = conn.execute("SELECT COUNT(*), MAX(id), MAX(updated_at) FROM instagram_accounts").fetchone()
+        return json.dumps([stat.st_mtime_ns, stat.st_size, *db_state])
+
+    def _save_sync_fingerprint(self):
+        """Remember the current fingerprint after a successful sync check."""
+        fingerprint = self._sync_fingerprint()
+        if fingerprint is not None:
+            with self._connect() as conn:
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('sync_fingerprint', ?)", (fingerprint,))
+
     def ensure_sync(self):
         """Ensure CSV and database are in sync, performing sync if needed."""
         logger.info("Checking CSV and database sync status...")
+        # Nothing to diff if neither the CSV nor the accounts table changed since the last successful check
+        fingerprint = self._sync_fingerprint()
+        if fingerprint is not None:
+            with self._connect() as conn:
+                row = conn.execute("SELECT value FROM meta WHERE key = 'sync_fingerprint'").fetchone()
+            if row and row[0] == fingerprint:
+                logger.info("✅ CSV and database are in sync (unchanged since last check)")
+                return True
+
         is_sync, sync_info = self.check_sync_status()
         if sync_info.get('error'):
             logger.error(f"Error during sync check: {sync_info['error']}")
@@ -224,6 +548,7 @@ class InstagramDataManager:
             logger.info("✅ CSV and database are in sync")
             logger.info(f"   - CSV usernames: {sync_info['csv_count']}")
             logger.info(f"   - Database usernames: {sync_info['db_count']}")
+            self._save_sync_fingerprint()
             return True
         else:
             logger.warning("⚠️  CSV and database are out of sync")
@@ -232,10 +557,15 @@ class InstagramDataManager:
             logger.info(f"   - Usernames only in CSV: {len(sync_info['csv_only'])}")
             logger.info(f"   - Usernames only in database: {len(sync_info['db_only'])}")
             logger.info("🔄 Syncing CSV to database...")
-            self.sync_csv_to_database()
-            is_sync_after, sync_info_after = self.check_sync_status()
+            # The diff already names the missing usernames, so insert exactly those instead of re-reading
+            # the CSV. They are unique and absent from the database, so the sync succeeded iff every one
+            # was inserted; usernames only in the database are untouched by the sync.
+            _, inserted = self._insert_new_usernames(sync_info['csv_only'])
+            logger.info(f"Committed {inserted} new usernames to the database.")
+            is_sync_after = inserted == len(sync_info['csv_only']) and not sync_info['db_only']
             if is_sync_after:
                 logger.info("✅ Sync completed successfully")
+                self._save_sync_fingerprint()
                 return True
             else:
                 logger.error("❌ Sync failed")
@@ -243,83 +573,82 @@ class InstagramDataManager:
 
     def update_account_fields(self, username: str, follower_count: Optional[int] = None, following_count: Optional[int] = None, reels_list: Optional[str] = None, reels_selected_list: Optional[str] = None, insta_id: Optional[str] = None, all_reels_fetched_hiker: Optional[bool] = None, all_following_fetched_hiker: Optional[bool] = None):
         """Update specific fields for a given account by username."""
+        fields, params = _account_update_params(dict(
+            username=username, follower_count=follower_count, following_count=following_count,
+            reels_list=reels_list, reels_selected_list=reels_selected_list, insta_id=insta_id,
+            all_reels_fetched_hiker=all_reels_fetched_hiker, all_following_fetched_hiker=all_following_fetched_hiker
+        ))
+        if not fields:
+            logger.warning("No fields to update for account.")
+            return
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
+                conn.execute(_account_update_sql(fields), params)
+                self._insta_ids.pop(username, None)
+                logger.info(f"Updated account {username}: {', '.join(fields)}")
+        except Exception as e:
+            logger.error(f"Error updating account fields: {e}")
+            raise
+
+    def update_accounts_bulk(self, rows: List[dict]):
+        """
+        Update many accounts in one transaction. Each row is a dict with 'username' plus any of the
+        keyword fields of update_account_fields; None values are left untouched. Rows that set the same
+        fields share one UPDATE statement run through executemany.
+        """
+        groups = defaultdict(list)
+        for row in rows:
+            fields, params = _account_update_params(row)
+            if fields:
+                groups[fields].append(params)
+        if not groups:
+            logger.warning("No fields to update for accounts.")
+            return
+        try:
+            with self._connect() as conn:
                 cursor = conn.cursor()
-                updates = []
-                params = []
-                if follower_count is not None:
-                    updates.append("follower_count = ?")
-                    params.append(follower_count)
-                if following_count is not None:
-                    updates.append("following_count = ?")
-                    params.append(following_count)
-                if reels_list is not None:
-                    updates.append("reels_list = ?")
-                    params.append(reels_list)
-                if reels_selected_list is not None:
-                    updates.append("reels_selected_list = ?")
-                    params.append(reels_selected_list)
-                if insta_id is not None:
-                    updates.append("insta_id = ?")
-                    params.append(insta_id)
-                if all_reels_fetched_hiker is not None:
-                    updates.append("all_reels_fetched_hiker = ?")
-                    params.append(1 if all_reels_fetched_hiker else 0)
-                if all_following_fetched_hiker is not None:
-                    updates.append("all_following_fetched_hiker = ?")
-                    params.append(1 if all_following_fetched_hiker else 0)
-                if not updates:
-                    logger.warning("No fields to update for account.")
-                    return
-                params.append(username)
-                sql = f"UPDATE instagram_accounts SET {', '.join(updates)}, updated_at = CURRENT_TIMESTAMP WHERE username = ?"
-                cursor.execute(sql, params)
+                updated = 0
+                for fields, params in groups.items():
+                    cursor.executemany(_account_update_sql(fields), params)
+                    updated += cursor.rowcount
+                    if 'insta_id' in fields:
+                        for row in params:
+                            self._insta_ids.pop(row[-1], None)
+                logger.info(f"Bulk-updated {updated} accounts in {len(groups)} statement group(s).")
+        except Exception as e:
+            logger.error(f"Error bulk-updating account fields: {e}")
+            raise
+
+    def set_reels_selected(self, insta_id: str, reel_pks: List[str]):
+        """Store the selected reel PKs as a JSON list for the account with the given insta_id."""
+        try:
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "UPDATE instagram_accounts SET reels_selected_list = ?, updated_at = CURRENT_TIMESTAMP WHERE insta_id = ?",
+                    (json.dumps(reel_pks), insta_id)
+                )
                 conn.commit()
-                logger.info(f"Updated account {username}: {', '.join(updates)}")
+                logger.info(f"Set reels_selected_list for insta_id {insta_id} to {len(reel_pks)} reels.")
         except Exception as e:
-            logger.error(f"Error updating account fields: {e}")
+            logger.error(f"Error setting reels_selected_list for insta_id {insta_id}: {e}")
             raise
 
     def upsert_account(self, username: str, insta_id: str, follower_count: int, following_count: int, full_name: Optional[str] = None, url: Optional[str] = None, profile_pic_url: Optional[str] = None, biography: Optional[str] = None, city_name: Optional[str] = None, followers_list: Optional[str] = None, following_list: Optional[str] = None, reels_list: Optional[str] = None, reels_selected_list: Optional[str] = None, aesthetic_profile_text: Optional[str] = None, aesthetic_profile_embedding: Optional[str] = None):
         """Insert or update an Instagram account."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
 
-                # The order of columns in the INSERT statement must match the order of values in the tuple.
-                columns = [
-                    'username', 'insta_id', 'follower_count', 'following_count', 'full_name', 'url',
-                    'profile_pic_url', 'biography', 'city_name', 'followers_list', 'following_list', 
-                    'reels_list', 'reels_selected_list', 'aesthetic_profile_text', 'aesthetic_profile_embedding'
-                ]
-                values = [
+                # Values in ACCOUNT_UPSERT_COLUMNS order
+                values = (
                     username, insta_id, follower_count, following_count, full_name, url,
-                    profile_pic_url, biography, city_name, followers_list, following_list, 
+                    profile_pic_url, biography, city_name, followers_list, following_list,
                     reels_list, reels_selected_list, aesthetic_profile_text, aesthetic_profile_embedding
-                ]
-
-                cursor.execute(f'''
-                    INSERT INTO instagram_accounts ({', '.join(columns)})
-                    VALUES ({', '.join(['?'] * len(columns))})
-                    ON CONFLICT(username) DO UPDATE SET
-                        insta_id = excluded.insta_id,
-                        follower_count = excluded.follower_count,
-                        following_count = excluded.following_count,
-                        full_name = excluded.full_name,
-                        url = excluded.url,
-                        profile_pic_url = excluded.profile_pic_url,
-                        biography = excluded.biography,
-                        city_name = excluded.city_name,
-                        followers_list = excluded.followers_list,
-                        following_list = excluded.following_list,
-                        reels_list = excluded.reels_list,
-                        reels_selected_list = excluded.reels_selected_list,
-                        aesthetic_profile_text = excluded.aesthetic_profile_text,
-                        aesthetic_profile_embedding = excluded.aesthetic_profile_embedding,
-                        updated_at = CURRENT_TIMESTAMP
-                ''', values)
+                )
+                cursor.execute(SQL_UPSERT_ACCOUNT, values)
                 conn.commit()
+                self._insta_ids.pop(username, None)
                 logger.info(f"Upserted account {username} successfully.")
         except Exception as e:
             logger.error(f"Error upserting account {username}: {e}")
@@ -327,12 +656,15 @@ class InstagramDataManager:
 
     def get_user_insta_id(self, username: str) -> Optional[str]:
         """Get the insta_id for a given username."""
+        if username in self._insta_ids:
+            return self._insta_ids[username]
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
-                cursor.execute("SELECT insta_id FROM instagram_accounts WHERE username = ?", (username,))
+                cursor.execute(SQL_GET_INSTA_ID, (username,))
                 result = cursor.fetchone()
                 if result and result[0]:
+                    self._insta_ids[username] = result[0]
                     return result[0]
                 return None
         except Exception as e:
@@ -342,9 +674,9 @@ class InstagramDataManager:
     def count_reels_for_user(self, user_pk: str) -> int:
         """Count the number of reels for a given user_pk."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
-                cursor.execute("SELECT COUNT(*) FROM reels WHERE user_pk = ?", (user_pk,))
+                cursor.execute(SQL_COUNT_REELS_FOR_USER, (user_pk,))
                 count = cursor.fetchone()[0]
                 logger.info(f"Found {count} reels for user_pk {user_pk}.")
                 return count
@@ -355,10 +687,13 @@ class InstagramDataManager:
     def delete_reels_for_user(self, user_pk: str):
         """Delete all reels for a given user_pk."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 cursor.execute("DELETE FROM reels WHERE user_pk = ?", (user_pk,))
                 conn.commit()
+                # Re-fetched reels come back with fresh flags; the pk sets do not know which user owned them
+                self._downloaded_pks.clear()
+                self._unavailable_pks.clear()
                 logger.info(f"Deleted {cursor.rowcount} reels for user_pk {user_pk}.")
         except Exception as e:
             logger.error(f"Error deleting reels for user {user_pk}: {e}")
@@ -367,12 +702,12 @@ class InstagramDataManager:
     def get_top_reels(self, user_pk: str, limit: int = 5) -> List[str]:
         """Get the top N most viewed reels for a given user_pk."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     SELECT pk FROM reels
                     WHERE user_pk = ?
-                    ORDER BY CAST(play_count AS INTEGER) DESC
+                    ORDER BY play_count DESC
                     LIMIT ?
                 """, (user_pk, limit))
                 reels = [row[0] for row in cursor.fetchall()]
@@ -382,58 +717,86 @@ class InstagramDataManager:
             logger.error(f"Error getting top reels for user {user_pk}: {e}")
             raise
 
-    def save_reels(self, reels_data: List[dict], user_pk: str):
-        """Save a list of reels to the database."""
+    def _reel_to_row(self, reel, user_pk: str) -> tuple:
+        """
+        Flatten a reel into a row for the reels INSERT. Accepts either a raw API dict
+        (Hiker) or an instagrapi Media model, which is read attribute-wise without dumping it to JSON first.
+        """
+        if isinstance(reel, dict):
+            pk = reel.get('pk')
+            taken_at = reel.get('taken_at')
+            caption = reel.get('caption', {}).get('text') if isinstance(reel.get('caption'), dict) else None
+            row_tail = (
+                reel.get('comment_count'),
+                reel.get('like_count'),
+                reel.get('play_count'),
+                reel.get('video_duration'),
+                reel.get('thumbnail_url'),
+                reel.get('video_url'),
+            )
+            reel_id, code = reel.get('id'), reel.get('code')
+        else:
+            pk = reel.pk
+            taken_at = reel.taken_at
+            caption = getattr(reel, 'caption_text', None) or None
+            thumbnail_url = getattr(reel, 'thumbnail_url', None)
+            video_url = getattr(reel, 'video_url', None)
+            row_tail = (
+                getattr(reel, 'comment_count', None),
+                getattr(reel, 'like_count', None),
+                getattr(reel, 'play_count', None),
+                getattr(reel, 'video_duration', None),
+                str(thumbnail_url) if thumbnail_url else None,
+                str(video_url) if video_url else None,
+            )
+            reel_id, code = reel.id, reel.code
+
+        taken_at_datetime = None
+        if isinstance(taken_at, datetime):
+            # instagrapi gives an aware UTC datetime; store local time like the timestamp branch below
+            taken_at_datetime = taken_at.astimezone().strftime('%Y-%m-%d %H:%M:%S')
+        elif taken_at:
+            try:
+                # Convert Unix timestamp to datetime string
+                taken_at_datetime = datetime.fromtimestamp(int(taken_at)).strftime('%Y-%m-%d %H:%M:%S')
+            except (ValueError, TypeError) as e:
+                logger.warning(f"Could not convert timestamp {taken_at} for reel {pk}: {e}")
+
+        return (pk, reel_id, user_pk, code, taken_at_datetime) + row_tail + (caption,)
+
+    def save_reels(self, reels_data: list, user_pk: str):
+        """Save a list of reels (API dicts or instagrapi Media models) to the database."""
         if not reels_data:
             logger.info("No reels data to save.")
             return
         
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 
-                reels_to_insert = []
-                for reel in reels_data:
-                    taken_at_unix = reel.get('taken_at')
-                    taken_at_datetime = None
-                    if taken_at_unix:
-                        try:
-                            # Convert Unix timestamp to datetime string
-                            taken_at_datetime = datetime.fromtimestamp(int(taken_at_unix)).strftime('%Y-%m-%d %H:%M:%S')
-                        except (ValueError, TypeError) as e:
-                            logger.warning(f"Could not convert timestamp {taken_at_unix} for reel {reel.get('pk')}: {e}")
-
-                    reels_to_insert.append((
-                        reel.get('pk'),
-                        reel.get('id'),
-                        user_pk,
-                        reel.get('code'),
-                        taken_at_datetime,
-                        reel.get('comment_count'),
-                        reel.get('like_count'),
-                        reel.get('play_count'),
-                        reel.get('video_duration'),
-                        reel.get('thumbnail_url'),
-                        reel.get('video_url'),
-                        reel.get('caption', {}).get('text') if isinstance(reel.get('caption'), dict) else None
-                    ))
+                reels_to_insert = [self._reel_to_row(reel, user_pk) for reel in reels_data]
 
-                cursor.executemany('''
-                    INSERT INTO reels (
+                # One explicit write transaction for all statements, committed once when the block exits.
+                # Rows go in as multi-row VALUES statements instead of one executemany step per row.
+                if not conn.in_transaction:
+                    conn.execute("BEGIN IMMEDIATE")
+                affected = _execute_multirow(
+                    cursor,
+                    '''INSERT INTO reels (
                         pk, id, user_pk, code, taken_at, comment_count, 
                         like_count, play_count, video_duration, thumbnail_url, video_url, caption
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ON CONFLICT(pk) DO UPDATE SET
+                    )''',
+                    reels_to_insert,
+                    '''ON CONFLICT(pk) DO UPDATE SET
                         comment_count = excluded.comment_count,
                         like_count = excluded.like_count,
                         play_count = excluded.play_count,
                         thumbnail_url = excluded.thumbnail_url,
                         video_url = excluded.video_url,
-                        caption = excluded.caption
-                ''', reels_to_insert)
-                
-                conn.commit()
-                logger.info(f"Attempted to save/update {len(reels_to_insert)} reels. {cursor.rowcount} rows were affected.")
+                        caption = excluded.caption'''
+                )
+
+                logger.info(f"Attempted to save/update {len(reels_to_insert)} reels. {affected} rows were affected.")
         except Exception as e:
             logger.error(f"Error saving reels to database: {e}")
             raise
@@ -441,22 +804,20 @@ class InstagramDataManager:
     def get_user_hiker_status(self, username: str) -> Tuple[int, bool]:
         """Get reels count and hiker fetch status for a user."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
-                cursor.execute("SELECT insta_id, all_reels_fetched_hiker FROM instagram_accounts WHERE username = ?", (username,))
+                # One round trip: the correlated count is an index range scan, and 0 when insta_id is NULL
+                cursor.execute("""
+                    SELECT (SELECT COUNT(*) FROM reels r WHERE r.user_pk = ia.insta_id), ia.all_reels_fetched_hiker
+                    FROM instagram_accounts ia
+                    WHERE ia.username = ?
+                """, (username,))
                 result = cursor.fetchone()
                 if not result:
                     return 0, False  # User not in DB
-                
-                user_pk, all_reels_fetched_hiker = result
-                all_reels_fetched_hiker = bool(all_reels_fetched_hiker) if all_reels_fetched_hiker is not None else False
-    
-                if not user_pk:
-                    return 0, all_reels_fetched_hiker
-    
-                cursor.execute("SELECT COUNT(*) FROM reels WHERE user_pk = ?", (user_pk,))
-                count = cursor.fetchone()[0]
-                return count, all_reels_fetched_hiker
+
+                count, all_reels_fetched_hiker = result
+                return count, bool(all_reels_fetched_hiker)
         except Exception as e:
             logger.error(f"Error getting hiker status for user {username}: {e}")
             return 0, False
@@ -464,7 +825,7 @@ class InstagramDataManager:
     def get_user_following_hiker_status(self, username: str) -> bool:
         """Check if all following for a user have been fetched."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT all_following_fetched_hiker FROM instagram_accounts WHERE username = ?", (username,))
                 result = cursor.fetchone()
@@ -481,7 +842,7 @@ class InstagramDataManager:
         Returns a list of tuples: (username, insta_id, all_reels_fetched_hiker, all_following_fetched_hiker, reel_count)
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     SELECT
@@ -489,18 +850,9 @@ class InstagramDataManager:
                         ia.insta_id,
                         ia.all_reels_fetched_hiker,
                         ia.all_following_fetched_hiker,
-                        IFNULL(r.reel_count, 0) as reel_count
+                        (SELECT COUNT(*) FROM reels r WHERE r.user_pk = ia.insta_id) as reel_count
                     FROM
                         instagram_accounts ia
-                    LEFT JOIN (
-                        SELECT
-                            user_pk,
-                            COUNT(*) as reel_count
-                        FROM
-                            reels
-                        GROUP BY
-                            user_pk
-                    ) r ON ia.insta_id = r.user_pk
                 """)
                 users_status = cursor.fetchall()
                 logger.info(f"Retrieved hiker processing status for {len(users_status)} users.")
@@ -516,7 +868,7 @@ class InstagramDataManager:
             return
 
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
 
                 following_to_insert = []
@@ -529,14 +881,19 @@ class InstagramDataManager:
                         str(person.get('profile_pic_url')),
                     ))
 
-                cursor.executemany('''
-                    INSERT OR IGNORE INTO following (
+                # One explicit write transaction for all statements, committed once when the block exits.
+                # Rows go in as multi-row VALUES statements instead of one executemany step per row.
+                if not conn.in_transaction:
+                    conn.execute("BEGIN IMMEDIATE")
+                inserted = _execute_multirow(
+                    cursor,
+                    '''INSERT OR IGNORE INTO following (
                         user_pk, following_pk, following_username, following_full_name, following_profile_pic_url
-                    ) VALUES (?, ?, ?, ?, ?)
-                ''', following_to_insert)
+                    )''',
+                    following_to_insert
+                )
 
-                conn.commit()
-                logger.info(f"Attempted to save {len(following_to_insert)} following. {cursor.rowcount} new following were inserted.")
+                logger.info(f"Attempted to save {len(following_to_insert)} following. {inserted} new following were inserted.")
         except Exception as e:
             logger.error(f"Error saving following to database: {e}")
             raise
@@ -544,25 +901,34 @@ class InstagramDataManager:
     def fill_missing_reels_selected_list(self, top_n: int = 5):
         """Fill missing reels_selected_list for users who have reels but no selected reels."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
-                # Find users with missing reels_selected_list and at least one reel
+                # Rank the reels of every user with a missing reels_selected_list in one query; rows come back
+                # ordered by account and rank, so each user's list is built by groupby and written in one
+                # executemany keyed on the account's rowid id
                 cursor.execute('''
-                    SELECT ia.username, ia.insta_id
-                    FROM instagram_accounts ia
-                    JOIN reels r ON ia.insta_id = r.user_pk
-                    WHERE ia.reels_selected_list IS NULL OR ia.reels_selected_list = ''
-                    GROUP BY ia.insta_id
-                ''')
-                users = cursor.fetchall()
-                logger.info(f"Found {len(users)} users with missing reels_selected_list.")
-                for username, insta_id in users:
-                    # Get top reels for this user
-                    top_reels = self.get_top_reels(insta_id, limit=top_n)
-                    if top_reels:
-                        reels_selected_list_json = json.dumps(top_reels)
-                        self.update_account_fields(username=username, reels_selected_list=reels_selected_list_json)
-                        logger.info(f"Filled reels_selected_list for {username} with top {len(top_reels)} reels.")
+                    WITH ranked AS (
+                        SELECT ia.id AS account_id, r.pk,
+                               ROW_NUMBER() OVER (PARTITION BY ia.id ORDER BY r.play_count DESC) AS rn
+                        FROM instagram_accounts ia
+                        JOIN reels r ON r.user_pk = ia.insta_id
+                        WHERE ia.reels_selected_list IS NULL OR ia.reels_selected_list = ''
+                    )
+                    SELECT account_id, pk FROM ranked
+                    WHERE rn <= ?
+                    ORDER BY account_id, rn
+                ''', (top_n,))
+                rows = [
+                    (json.dumps([pk for _, pk in group]), account_id)
+                    for account_id, group in groupby(cursor.fetchall(), key=lambda row: row[0])
+                ]
+                logger.info(f"Found {len(rows)} users with missing reels_selected_list.")
+                cursor.executemany('''
+                    UPDATE instagram_accounts
+                    SET reels_selected_list = ?, updated_at = CURRENT_TIMESTAMP
+                    WHERE id = ? AND (reels_selected_list IS NULL OR reels_selected_list = '')
+                ''', rows)
+                logger.info(f"Filled reels_selected_list for {len(rows)} users.")
         except Exception as e:
             logger.error(f"Error filling missing reels_selected_list: {e}")
 
@@ -574,15 +940,15 @@ class InstagramDataManager:
         if not reel_pks:
             return set()
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
-                placeholders = ','.join('?' for _ in reel_pks)
-                query = f"""
+                # The PKs are bound once as a JSON array and expanded by json_each, so the statement
+                # text is fixed (and cached) and there is no bound-parameter limit on the list size
+                cursor.execute("""
                     SELECT pk FROM reels
-                    WHERE pk IN ({placeholders})
+                    WHERE pk IN (SELECT value FROM json_each(?))
                     AND (downloaded = 1 OR video_unavailable = 1)
-                """
-                cursor.execute(query, tuple(reel_pks))
+                """, (json.dumps(list(reel_pks)),))
                 reels_to_skip = {row[0] for row in cursor.fetchall()}
                 return reels_to_skip
         except Exception as e:
@@ -592,10 +958,12 @@ class InstagramDataManager:
     def mark_reel_as_downloaded(self, pk: str):
         """Mark a reel as downloaded by its pk."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
-                cursor.execute("UPDATE reels SET downloaded = 1 WHERE pk = ?", (pk,))
+                cursor.execute(SQL_MARK_REEL_DOWNLOADED, (pk,))
                 conn.commit()
+                if cursor.rowcount:
+                    self._downloaded_pks.add(pk)
                 logger.info(f"Marked reel {pk} as downloaded.")
         except Exception as e:
             logger.error(f"Error marking reel {pk} as downloaded: {e}")
@@ -603,12 +971,17 @@ class InstagramDataManager:
 
     def is_reel_downloaded(self, pk: str) -> bool:
         """Check if a reel is marked as downloaded."""
+        if pk in self._downloaded_pks:
+            return True
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
-                cursor.execute("SELECT downloaded FROM reels WHERE pk = ?", (pk,))
+                cursor.execute(SQL_IS_REEL_DOWNLOADED, (pk,))
                 result = cursor.fetchone()
-                return bool(result and result[0])
+                if result and result[0]:
+                    self._downloaded_pks.add(pk)
+                    return True
+                return False
         except Exception as e:
             logger.error(f"Error checking if reel {pk} is downloaded: {e}")
             return False
@@ -616,9 +989,9 @@ class InstagramDataManager:
     def get_reel_video_url(self, pk: str) -> Optional[str]:
         """Get the video_url for a given reel pk."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
-                cursor.execute("SELECT video_url FROM reels WHERE pk = ?", (pk,))
+                cursor.execute(SQL_GET_REEL_VIDEO_URL, (pk,))
                 result = cursor.fetchone()
                 if result and result[0]:
                     return result[0]
@@ -630,9 +1003,9 @@ class InstagramDataManager:
     def get_reel_thumbnail_url(self, pk: str) -> Optional[str]:
         """Get the thumbnail_url for a given reel pk."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
-                cursor.execute("SELECT thumbnail_url FROM reels WHERE pk = ?", (pk,))
+                cursor.execute(SQL_GET_REEL_THUMBNAIL_URL, (pk,))
                 result = cursor.fetchone()
                 if result and result[0]:
                     return result[0]
@@ -644,7 +1017,7 @@ class InstagramDataManager:
     def get_all_selected_reels(self):
         """Return a list of (username, reels_selected_list) for all users with non-empty reels_selected_list."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT username, reels_selected_list FROM instagram_accounts WHERE reels_selected_list IS NOT NULL AND reels_selected_list != ''")
                 return cursor.fetchall()
@@ -654,16 +1027,7 @@ class InstagramDataManager:
 
     def get_all_selected_reel_pks(self) -> List[str]:
         """Get all unique reel PKs from all users' reels_selected_list."""
-        users = self.get_all_selected_reels()
-        all_pks = set()
-        for _, reels_selected_list in users:
-            try:
-                pks = json.loads(reels_selected_list)
-                if isinstance(pks, list):
-                    all_pks.update(pks)
-            except (json.JSONDecodeError, TypeError):
-                continue
-        return list(all_pks)
+        return self.get_selected_reels_list()
 
     def get_reels_for_music_analysis(self, reel_pks: List[str]) -> List[str]:
         """
@@ -673,16 +1037,15 @@ class InstagramDataManager:
         if not reel_pks:
             return []
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
-                placeholders = ','.join('?' for _ in reel_pks)
-                query = f"""
+                # One JSON-array parameter instead of N placeholders: fixed (cached) SQL text, no parameter limit
+                cursor.execute("""
                     SELECT pk FROM reels
-                    WHERE pk IN ({placeholders})
+                    WHERE pk IN (SELECT value FROM json_each(?))
                     AND (audio_type IS NULL OR audio_type = '')
                     AND (no_audio = 0 OR no_audio IS NULL)
-                """
-                cursor.execute(query, tuple(reel_pks))
+                """, (json.dumps(list(reel_pks)),))
                 reels_to_process = [row[0] for row in cursor.fetchall()]
                 logger.info(f"Found {len(reels_to_process)} reels requiring music analysis out of {len(reel_pks)} candidates.")
                 return reels_to_process
@@ -693,10 +1056,12 @@ class InstagramDataManager:
     def mark_reel_as_unavailable(self, pk: str):
         """Mark a reel as unavailable by its pk."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
-                cursor.execute("UPDATE reels SET video_unavailable = 1 WHERE pk = ?", (pk,))
+                cursor.execute(SQL_MARK_REEL_UNAVAILABLE, (pk,))
                 conn.commit()
+                if cursor.rowcount:
+                    self._unavailable_pks.add(pk)
                 logger.info(f"Marked reel {pk} as video_unavailable.")
         except Exception as e:
             logger.error(f"Error marking reel {pk} as unavailable: {e}")
@@ -704,12 +1069,17 @@ class InstagramDataManager:
 
     def is_reel_unavailable(self, pk: str) -> bool:
         """Check if a reel is marked as unavailable."""
+        if pk in self._unavailable_pks:
+            return True
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
-                cursor.execute("SELECT video_unavailable FROM reels WHERE pk = ?", (pk,))
+                cursor.execute(SQL_IS_REEL_UNAVAILABLE, (pk,))
                 result = cursor.fetchone()
-                return bool(result and result[0])
+                if result and result[0]:
+                    self._unavailable_pks.add(pk)
+                    return True
+                return False
         except Exception as e:
             logger.error(f"Error checking if reel {pk} is unavailable: {e}")
             return False
@@ -717,9 +1087,9 @@ class InstagramDataManager:
     def set_no_audio_flag(self, pk: str):
         """Set the no_audio flag in the reels table for the given pk. Adds the column if it doesn't exist."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
-                cursor.execute("UPDATE reels SET no_audio = 1 WHERE pk = ?", (pk,))
+                cursor.execute(SQL_SET_NO_AUDIO, (pk,))
                 conn.commit()
                 logger.info(f"Set no_audio flag for reel {pk}.")
         except Exception as e:
@@ -729,9 +1099,9 @@ class InstagramDataManager:
     def set_audio_info(self, pk: str, audio_type: str, audio_content: Optional[str] = None):
         """Set the audio_type and audio_content fields for a reel by pk. Adds columns if they don't exist."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
-                cursor.execute("UPDATE reels SET audio_type = ?, audio_content = ? WHERE pk = ?", (audio_type, audio_content, pk))
+                cursor.execute(SQL_SET_AUDIO_INFO, (audio_type, audio_content, pk))
                 conn.commit()
                 logger.info(f"Set audio_type={audio_type}, audio_content={audio_content} for reel {pk}.")
         except Exception as e:
@@ -739,15 +1109,11 @@ class InstagramDataManager:
             raise
 
     def set_caption_english(self, pk: str, caption_english: str):
-        """Set the caption_english field for a reel by pk. Adds the column if it doesn't exist."""
+        """Set the caption_english field for a reel by pk."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
-                cursor.execute("PRAGMA table_info(reels)")
-                columns = [row[1] for row in cursor.fetchall()]
-                if 'caption_english' not in columns:
-                    cursor.execute("ALTER TABLE reels ADD COLUMN caption_english TEXT")
-                cursor.execute("UPDATE reels SET caption_english = ? WHERE pk = ?", (caption_english, pk))
+                cursor.execute(SQL_SET_CAPTION_ENGLISH, (caption_english, pk))
                 conn.commit()
                 logger.info(f"Set caption_english for reel {pk}.")
         except Exception as e:
@@ -757,21 +1123,9 @@ class InstagramDataManager:
     def get_selected_reels_with_captions(self):
         """Return a list of (pk, caption, caption_english) for all reels in selected_reels lists of all users."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
-                cursor.execute("SELECT reels_selected_list FROM instagram_accounts WHERE reels_selected_list IS NOT NULL AND reels_selected_list != ''")
-                all_pks = set()
-                for (reels_selected_list,) in cursor.fetchall():
-                    try:
-                        pks = json.loads(reels_selected_list)
-                        if isinstance(pks, list):
-                            all_pks.update(pks)
-                    except Exception:
-                        continue
-                if not all_pks:
-                    return []
-                placeholders = ','.join('?' for _ in all_pks)
-                cursor.execute(f"SELECT pk, caption, caption_english FROM reels WHERE pk IN ({placeholders})", tuple(all_pks))
+                cursor.execute("SELECT pk, caption, caption_english FROM reels WHERE pk IN (SELECT pk FROM reels_selected)")
                 return cursor.fetchall()
         except Exception as e:
             logger.error(f"Error fetching selected reels with captions: {e}")
@@ -780,7 +1134,7 @@ class InstagramDataManager:
     def get_followed_creators_with_reels_selected_list(self):
         """For each user with a non-empty reels_selected_list, get the list of insta_id's of other such users they follow."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
                     SELECT
@@ -811,7 +1165,7 @@ class InstagramDataManager:
     def update_followed_creators_with_reels_selected_list(self, insta_id: str, followed_list_json: str):
         """Update the followed_creators_with_reels_selected_list field for a user by insta_id."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 cursor.execute(
                     "UPDATE instagram_accounts SET followed_creators_with_reels_selected_list = ?, updated_at = CURRENT_TIMESTAMP WHERE insta_id = ?",
@@ -826,7 +1180,7 @@ class InstagramDataManager:
     def get_speech_reels_to_process(self, batch_size: int = 10) -> List[Tuple[str, str]]:
         """Get reels with audio_type 'speech' that need processing."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     SELECT pk, video_url FROM reels 
@@ -845,7 +1199,7 @@ class InstagramDataManager:
     def get_speech_processing_stats(self) -> dict:
         """Get statistics about speech processing."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 
                 # Count reels by audio_type
@@ -893,9 +1247,9 @@ class InstagramDataManager:
     def mark_reel_as_no_audio_and_clear_type(self, pk: str):
         """Mark a reel as no_audio and clear the audio_type."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
-                cursor.execute("UPDATE reels SET no_audio = 1, audio_type = '' WHERE pk = ?", (pk,))
+                cursor.execute(SQL_MARK_NO_AUDIO_CLEAR_TYPE, (pk,))
                 conn.commit()
                 logger.info(f"Marked reel {pk} as no_audio and cleared audio_type")
         except Exception as e:
@@ -905,15 +1259,11 @@ class InstagramDataManager:
     def get_reel_info(self, reel_id: str) -> Optional[dict]:
         """Get complete reel information by ID for video processing."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
+            with self._connect() as conn:
+                # Row factory on this cursor only; the connection is shared with every other method
                 cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT pk, user_pk, code, caption, caption_english, caption_english_short,
-                           audio_type, audio_content, audio_content_short, video_url
-                    FROM reels 
-                    WHERE pk = ?
-                """, (reel_id,))
+                cursor.row_factory = sqlite3.Row
+                cursor.execute(SQL_GET_REEL_INFO, (reel_id,))
                 
                 row = cursor.fetchone()
                 if not row:
@@ -928,24 +1278,11 @@ class InstagramDataManager:
     def get_selected_reels_list(self) -> List[str]:
         """Get the list of selected reel IDs from ALL users in instagram_accounts table."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
-                cursor.execute("SELECT reels_selected_list FROM instagram_accounts WHERE reels_selected_list IS NOT NULL AND reels_selected_list != ''")
-                rows = cursor.fetchall()
-                
-                all_reels = []
-                for row in rows:
-                    if row[0]:
-                        try:
-                            user_reels = json.loads(row[0])
-                            if isinstance(user_reels, list):
-                                all_reels.extend(user_reels)
-                        except json.JSONDecodeError:
-                            logger.error("Failed to parse reels_selected_list JSON")
-                            continue
-                
-                unique_reels = list(set(all_reels))
-                logger.info(f"Found {len(unique_reels)} unique reels from {len(rows)} users")
+                cursor.execute("SELECT DISTINCT pk FROM reels_selected")
+                unique_reels = [row[0] for row in cursor.fetchall()]
+                logger.info(f"Found {len(unique_reels)} unique selected reels")
                 return unique_reels
         except Exception as e:
             logger.error(f"Error getting selected reels list: {e}")
@@ -954,14 +1291,14 @@ class InstagramDataManager:
     def get_reels_without_description(self, reel_ids: List[str]) -> List[str]:
         """Get reel IDs that don't have model_description_text yet."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
-                placeholders = ','.join(['?' for _ in reel_ids])
-                cursor.execute(f"""
-                    SELECT pk FROM reels 
-                    WHERE pk IN ({placeholders})
+                # One JSON-array parameter instead of N placeholders: fixed (cached) SQL text, no parameter limit
+                cursor.execute("""
+                    SELECT pk FROM reels
+                    WHERE pk IN (SELECT value FROM json_each(?))
                     AND (model_description_text IS NULL OR model_description_text = '')
-                """, reel_ids)
+                """, (json.dumps(list(reel_ids)),))
                 return [row[0] for row in cursor.fetchall()]
         except Exception as e:
             logger.error(f"Error getting reels without description: {e}")
@@ -970,12 +1307,9 @@ class InstagramDataManager:
     def set_model_description(self, pk: str, description: str):
         """Set the model_description_text field for a reel by pk."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
-                cursor.execute(
-                    "UPDATE reels SET model_description_text = ? WHERE pk = ?",
-                    (description, pk)
-                )
+                cursor.execute(SQL_SET_MODEL_DESCRIPTION, (description, pk))
                 conn.commit()
                 logger.info(f"Set model_description_text for reel {pk}")
         except Exception as e:
@@ -989,7 +1323,7 @@ class InstagramDataManager:
     def get_reels_for_embedding_generation(self) -> List[Tuple[str, str]]:
         """Get reels that need embedding generation (have descriptions but no embeddings)."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     SELECT pk, 
@@ -1007,12 +1341,12 @@ class InstagramDataManager:
             logger.error(f"Error getting reels for embedding generation: {e}")
             return []
 
-    def save_embedding(self, pk: str, embedding_blob: bytes):
-        """Save embedding blob for a reel by pk."""
+    def save_embedding(self, pk: str, embedding: np.ndarray):
+        """Save an embedding for a reel by pk, packed as float16 bytes."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
-                cursor.execute("UPDATE reels SET model_description_embeddings = ? WHERE pk = ?", (embedding_blob, pk))
+                cursor.execute(SQL_SAVE_EMBEDDING, (_emb_to_blob(embedding), pk))
                 conn.commit()
         except Exception as e:
             logger.error(f"Error saving embedding for reel {pk}: {e}")
@@ -1025,7 +1359,7 @@ class InstagramDataManager:
     def get_reels_for_processing(self) -> List[Tuple[str, str]]:
         """Get reels that have a model description but no processed description yet."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     SELECT pk, model_description_text
@@ -1043,9 +1377,9 @@ class InstagramDataManager:
     def save_processed_description(self, pk: str, processed_description: str):
         """Save processed description for a reel by pk."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
-                cursor.execute("UPDATE reels SET model_description_processed = ? WHERE pk = ?", (processed_description, pk))
+                cursor.execute(SQL_SAVE_PROCESSED_DESCRIPTION, (processed_description, pk))
                 conn.commit()
         except Exception as e:
             logger.error(f"Error saving processed description for reel {pk}: {e}")
@@ -1054,7 +1388,7 @@ class InstagramDataManager:
     def get_creator_profiles(self) -> Tuple[dict, dict]:
         """Get creator profiles by aggregating reels into creator profiles by averaging their embeddings."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute("""
@@ -1068,31 +1402,38 @@ class InstagramDataManager:
                 
                 reels_data = cursor.fetchall()
                 logger.info(f"Found {len(reels_data)} reels with embeddings")
-                
-                creator_reels = defaultdict(list)
-                for user_pk, reel_pk, embedding_blob in reels_data:
-                    embedding = self._load_embedding_from_blob(embedding_blob)
-                    if embedding is not None:
-                        creator_reels[user_pk].append((reel_pk, embedding))
-                
-                logger.info(f"Found {len(creator_reels)} creators with embeddings")
-                
+                if not reels_data:
+                    return {}, {}
+
+                user_pks, reel_pks, blobs = zip(*reels_data)
+                # Every embedding has the same width; skip any blob that does not (e.g. a truncated write)
+                lengths = np.fromiter(map(len, blobs), dtype=np.int64, count=len(blobs))
+                widths, width_counts = np.unique(lengths, return_counts=True)
+                keep = np.flatnonzero(lengths == widths[width_counts.argmax()])
+                if len(keep) < len(blobs):
+                    logger.warning(f"Skipping {len(blobs) - len(keep)} embeddings with an unexpected size")
+
+                # Decode all embeddings from one contiguous buffer into an (n_reels, dim) matrix
+                embeddings = _blob_to_emb(b''.join([blobs[i] for i in keep])).reshape(len(keep), -1)
+                user_pks = np.array(user_pks, dtype=object)[keep]
+                reel_pks = np.array(reel_pks, dtype=object)[keep]
+
+                # Rows are ordered by user_pk, so each creator is one contiguous run: sum every run with a
+                # single reduceat (accumulating in float32) and divide by the run lengths
+                starts = np.flatnonzero(np.r_[True, user_pks[1:] != user_pks[:-1]])
+                counts = np.diff(np.r_[starts, len(keep)])
+                means = np.add.reduceat(embeddings, starts, axis=0, dtype=np.float32)
+                means /= counts[:, None]
+                logger.info(f"Found {len(starts)} creators with embeddings")
+
                 creator_profiles = {}
                 creator_stats = {}
-                
-                for user_pk, reels in creator_reels.items():
-                    if len(reels) < 1:
-                        continue
-                    
-                    embeddings = [embedding for _, embedding in reels]
-                    reel_pks = [pk for pk, _ in reels]
-                    
-                    avg_embedding = np.mean(embeddings, axis=0)
-                    
-                    creator_profiles[user_pk] = avg_embedding
+                for mean, start, count in zip(means, starts.tolist(), counts.tolist()):
+                    user_pk = user_pks[start]
+                    creator_profiles[user_pk] = mean
                     creator_stats[user_pk] = {
-                        'reel_count': len(reels),
-                        'reel_pks': reel_pks
+                        'reel_count': count,
+                        'reel_pks': reel_pks[start:start + count].tolist()
                     }
                 
                 logger.info(f"Created profiles for {len(creator_profiles)} creators")
@@ -1107,8 +1448,7 @@ class InstagramDataManager:
         if blob_data is None:
             return None
         try:
-            embedding_array = np.frombuffer(blob_data, dtype=np.float32)
-            return embedding_array.reshape(1, -1)
+            return _blob_to_emb(blob_data)
         except Exception as e:
             logger.error(f"Error loading embedding from blob: {e}")
             return None
@@ -1122,23 +1462,26 @@ class InstagramDataManager:
         try:
             self.ensure_clustering_columns()
             
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
-                
+                # Both result sets go through one prepared UPDATE each, in one write transaction;
+                # every row is an idx_accounts_insta_id lookup
+                if not conn.in_transaction:
+                    conn.execute("BEGIN IMMEDIATE")
+
                 if kmeans_results:
-                    for user_pk, data in kmeans_results.items():
-                        cluster_id = data['cluster']
-                        cursor.execute("UPDATE instagram_accounts SET kmeans_cluster = ? WHERE insta_id = ?", (cluster_id, user_pk))
+                    cursor.executemany(
+                        "UPDATE instagram_accounts SET kmeans_cluster = ? WHERE insta_id = ?",
+                        [(data['cluster'], user_pk) for user_pk, data in kmeans_results.items()]
+                    )
                     logger.info(f"Saved K-means clustering results for {len(kmeans_results)} creators")
-                
+
                 if hdbscan_results:
-                    for user_pk, data in hdbscan_results.items():
-                        cluster_id = data['cluster']
-                        is_noise = 1 if data['is_noise'] else 0
-                        cursor.execute("UPDATE instagram_accounts SET hdbscan_cluster = ?, is_noise_point = ? WHERE insta_id = ?", (cluster_id, is_noise, user_pk))
+                    cursor.executemany(
+                        "UPDATE instagram_accounts SET hdbscan_cluster = ?, is_noise_point = ? WHERE insta_id = ?",
+                        [(data['cluster'], 1 if data['is_noise'] else 0, user_pk) for user_pk, data in hdbscan_results.items()]
+                    )
                     logger.info(f"Saved HDBSCAN clustering results for {len(hdbscan_results)} creators")
-                
-                conn.commit()
         except Exception as e:
             logger.error(f"Error saving clustering results: {e}")
             raise
@@ -1148,14 +1491,14 @@ class InstagramDataManager:
         try:
             self.ensure_clustering_columns()
             
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                for user_pk, coordinates in creator_coordinates.items():
-                    x, y = coordinates
-                    cursor.execute("UPDATE instagram_accounts SET umap_x = ?, umap_y = ? WHERE insta_id = ?", (float(x), float(y), user_pk))
-                
-                conn.commit()
+            with self._connect() as conn:
+                if not conn.in_transaction:
+                    conn.execute("BEGIN IMMEDIATE")
+                # One prepared UPDATE for every creator, each row found through idx_accounts_insta_id
+                conn.executemany(
+                    "UPDATE instagram_accounts SET umap_x = ?, umap_y = ? WHERE insta_id = ?",
+                    [(float(x), float(y), user_pk) for user_pk, (x, y) in creator_coordinates.items()]
+                )
                 logger.info(f"Saved UMAP coordinates for {len(creator_coordinates)} creators")
         except Exception as e:
             logger.error(f"Error saving UMAP coordinates: {e}")
@@ -1164,7 +1507,7 @@ class InstagramDataManager:
     def get_umap_coordinates(self) -> dict:
         """Get UMAP coordinates for all creators from the instagram_accounts table."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute("SELECT insta_id, umap_x, umap_y FROM instagram_accounts WHERE umap_x IS NOT NULL AND umap_y IS NOT NULL AND insta_id IS NOT NULL")
@@ -1180,7 +1523,7 @@ class InstagramDataManager:
     def get_clustering_stats(self) -> dict:
         """Get statistics about clustering results from instagram_accounts table."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute("SELECT kmeans_cluster, COUNT(*) as count FROM instagram_accounts WHERE kmeans_cluster IS NOT NULL GROUP BY kmeans_cluster ORDER BY kmeans_cluster")
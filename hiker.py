@@ -1,5 +1,4 @@
 import os
-import json
 import time
 import random
 from dotenv import load_dotenv
@@ -203,11 +202,7 @@ def process_user_with_hiker(
                 logger.info(f"Saved {len(reels_data)} reels for {username}")
                 top_reels_pks = data_manager.get_top_reels(user_pk=pk, limit=5)
                 if top_reels_pks:
-                    reels_selected_list_json = json.dumps(top_reels_pks)
-                    data_manager.update_account_fields(
-                        username=username,
-                        reels_selected_list=reels_selected_list_json
-                    )
+                    data_manager.set_reels_selected(pk, top_reels_pks)
                     logger.info(f"Updated account {username} with top {len(top_reels_pks)} reels.")
             # Always mark as fully fetched after processing all available reels
             data_manager.update_account_fields(username=username, all_reels_fetched_hiker=True)
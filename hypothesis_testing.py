@@ -16,9 +16,10 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 logger = logging.getLogger(__name__)
 
 
-def test_hypothesis_1_permutation(hdbscan_results, following_data, n_permutations=1000):
+def test_hypothesis_1_permutation(hdbscan_results, following_edges, n_permutations=1000):
     """
     H1 (Permutation Test): Tests if the observed intra-cluster connection rate is statistically significant.
+    following_edges is the list of (follower_pk, followed_pk) pairs from get_following_network_data.
     """
     logger.info("\n--- Testing Hypothesis 1 (Permutation Test) ---")
     
@@ -29,17 +30,18 @@ def test_hypothesis_1_permutation(hdbscan_results, following_data, n_permutation
         
     nodes = list(user_cluster_map.keys())
     
-    observed_intra_cluster_edges = 0
-    total_edges = 0
-    
+    # Only edges between non-noise creators count; the permutations reuse this filtered list
+    clustered_edges = [
+        (follower_pk, followed_pk) for follower_pk, followed_pk in following_edges
+        if follower_pk in user_cluster_map and followed_pk in user_cluster_map
+    ]
+    total_edges = len(clustered_edges)
+
     # Calculate the observed intra-cluster edge count among non-noise creators
-    for follower_pk, followed_pks in following_data.items():
-        if follower_pk not in user_cluster_map: continue
-        for followed_pk in followed_pks:
-            if followed_pk in user_cluster_map:
-                total_edges += 1
-                if user_cluster_map[follower_pk] == user_cluster_map[followed_pk]:
-                    observed_intra_cluster_edges += 1
+    observed_intra_cluster_edges = sum(
+        1 for follower_pk, followed_pk in clustered_edges
+        if user_cluster_map[follower_pk] == user_cluster_map[followed_pk]
+    )
     
     if total_edges == 0:
         logger.warning("No following edges found between clustered creators. Cannot test H1.")
@@ -56,12 +58,10 @@ def test_hypothesis_1_permutation(hdbscan_results, following_data, n_permutation
         random.shuffle(shuffled_clusters)
         shuffled_map = {node: cluster for node, cluster in zip(nodes, shuffled_clusters)}
         
-        current_intra_cluster_edges = 0
-        for follower_pk, followed_pks in following_data.items():
-            if follower_pk not in shuffled_map: continue
-            for followed_pk in followed_pks:
-                if followed_pk in shuffled_map and shuffled_map[follower_pk] == shuffled_map[followed_pk]:
-                    current_intra_cluster_edges += 1
+        current_intra_cluster_edges = sum(
+            1 for follower_pk, followed_pk in clustered_edges
+            if shuffled_map[follower_pk] == shuffled_map[followed_pk]
+        )
         
         permuted_rates.append(current_intra_cluster_edges / total_edges)
 
@@ -202,10 +202,10 @@ def main():
         logger.critical("HDBSCAN clustering failed. Aborting.")
         return
         
-    following_data = get_following_network_data(db_manager)
+    following_edges = get_following_network_data(db_manager)
     
     # Run the rigorous statistical tests
-    test_hypothesis_1_permutation(hdbscan_results, following_data)
+    test_hypothesis_1_permutation(hdbscan_results, following_edges)
     test_hypothesis_2_local_cohesion(hdbscan_results, creator_profiles, hdbscan_clusterer)
     test_hypothesis_3_vector_bridge(hdbscan_results, creator_profiles, hdbscan_clusterer)
 
@@ -1,6 +1,8 @@
 import logging
 import sqlite3
 import os
+import mmap
+from itertools import islice
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -8,30 +10,44 @@ logger = logging.getLogger(__name__)
 
 DB_PATH = "data/instagram_data.db"
 NEW_CSV_PATH = "data/new.csv"
+INSERT_CHUNK = 1000  # Rows per write transaction; keeps each commit within the page cache
 
-def extract_username_from_url(url: str) -> str:
-    """Extract username from Instagram URL."""
-    try:
-        # Handles URLs like https://www.instagram.com/username/ or /username/
-        return url.strip().rstrip('/').split('/')[-1]
-    except Exception:
-        return ""
+def iter_mmap_lines(f):
+    """
+    Yields decoded lines from an open binary file via a read-only memory map,
+    so the file is demand-paged by the OS instead of being read into the heap.
+    """
+    if os.fstat(f.fileno()).st_size == 0:
+        return  # mmap cannot map an empty file
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        pos = 0
+        size = mm.size()
+        while pos < size:
+            end = mm.find(b'\n', pos)
+            if end == -1:
+                end = size
+            yield mm[pos:end].decode('utf-8')
+            pos = end + 1
 
-def process_line(line: str) -> tuple[str, str]:
-    """Cleans a line from the CSV and returns a (username, url) tuple."""
-    line = line.strip()
-    if line.startswith('@'):
-        line = line[1:]
-    
-    if 'instagram.com' in line:
-        url = line
-        username = extract_username_from_url(url)
-    else:
-        # It's just a username
-        username = line
-        url = f"https://www.instagram.com/{username}/"
-        
-    return username, url
+def iter_new_rows(lines, seen: set):
+    """
+    Yields cleaned (username, url) tuples from CSV lines, skipping blanks and in-file duplicates.
+    Line parsing is inlined here since this loop runs once per CSV row.
+    """
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if line[:1] == '@':
+            line = line[1:]
+
+        # Handles URLs like https://www.instagram.com/username/ or /username/ as well as
+        # bare usernames, which contain no '/' and so come back unchanged.
+        username = line.rstrip('/').rpartition('/')[2]
+        if username and username not in seen:
+            seen.add(username)
+            # Always store the canonical profile URL so variants of the same link don't diverge
+            yield username, f"https://www.instagram.com/{username}/"
 
 def main():
     """
@@ -47,43 +63,46 @@ def main():
 
     conn = None
     try:
-        with open(NEW_CSV_PATH, 'r') as f:
-            lines = f.readlines()
-    except Exception as e:
-        logger.error(f"Error reading {NEW_CSV_PATH}: {e}")
-        return
-
-    try:
-        conn = sqlite3.connect(DB_PATH)
+        # A larger statement cache keeps the chunked INSERT prepared for the whole run
+        conn = sqlite3.connect(DB_PATH, cached_statements=256)
+        # WAL is persisted in the file by InstagramDataManager; these per-connection settings
+        # make each chunk commit cheaper and keep temporary b-trees and a 64 MB page cache in memory
+        conn.executescript(
+            "PRAGMA journal_mode=WAL;"
+            "PRAGMA synchronous=NORMAL;"
+            "PRAGMA temp_store=MEMORY;"
+            "PRAGMA cache_size=-64000;"
+        )
         cursor = conn.cursor()
-        
-        # Get existing usernames to avoid duplicates
-        cursor.execute("SELECT username FROM instagram_accounts")
-        existing_usernames = {row[0] for row in cursor.fetchall()}
-        logger.info(f"Found {len(existing_usernames)} existing users in the database.")
-        
-        new_users_to_add = []
-        for line in lines:
-            if not line.strip():
-                continue
-            
-            username, url = process_line(line)
-            if username and username not in existing_usernames:
-                new_users_to_add.append((username, url))
-                existing_usernames.add(username) # Add to set to handle duplicates within the CSV itself
 
-        if not new_users_to_add:
-            logger.info("No new users to add. Database is already up to date with new.csv.")
-            return
+        cursor.execute("SELECT COUNT(*) FROM instagram_accounts")
+        logger.info(f"Found {cursor.fetchone()[0]} existing users in the database.")
 
-        # Add new users to the database
-        cursor.executemany(
-            "INSERT OR IGNORE INTO instagram_accounts (username, url) VALUES (?, ?)",
-            new_users_to_add
-        )
-        conn.commit()
-        logger.info(f"Successfully added {cursor.rowcount} new users to the database.")
+        # Duplicates against the database are handled by the UNIQUE index via INSERT OR IGNORE,
+        # so only duplicates within the CSV itself need to be tracked here.
+        seen_usernames = set()
+        inserted_count = 0
+        with open(NEW_CSV_PATH, 'rb') as f:
+            rows = iter_new_rows(iter_mmap_lines(f), seen_usernames)
+            # Stream rows from the file in fixed-size chunks, one write transaction per chunk
+            while chunk := list(islice(rows, INSERT_CHUNK)):
+                cursor.execute("BEGIN IMMEDIATE")
+                cursor.executemany(
+                    "INSERT OR IGNORE INTO instagram_accounts (username, url) VALUES (?, ?)",
+                    chunk
+                )
+                conn.commit()
+                inserted_count += cursor.rowcount
+
+        if not seen_usernames:
+            logger.info("No users found in new.csv.")
+        elif inserted_count:
+            logger.info(f"Successfully added {inserted_count} new users to the database.")
+        else:
+            logger.info("No new users to add. Database is already up to date with new.csv.")
     
+    except (OSError, UnicodeDecodeError) as e:
+        logger.error(f"Error reading {NEW_CSV_PATH}: {e}")
     except sqlite3.Error as e:
         logger.error(f"Database error: {e}", exc_info=True)
     finally:
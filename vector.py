@@ -2,7 +2,6 @@ from transformers import AutoTokenizer, AutoModel
 from torch.nn.functional import cosine_similarity
 import torch
 import torch.nn.functional as F
-import numpy as np
 from tqdm import tqdm
 from db_manager import InstagramDataManager
 
@@ -62,12 +61,8 @@ def generate_embeddings_for_reels():
             # Normalize embeddings
             sentence_embedding = F.normalize(sentence_embedding, p=2, dim=1)
             
-            # Convert to numpy array and save as blob
-            embedding_array = sentence_embedding.cpu().numpy().astype(np.float32)
-            embedding_blob = embedding_array.tobytes()
-            
-            # Save to database
-            db_manager.save_embedding(pk, embedding_blob)
+            # Save to database (packed as float16 bytes by save_embedding)
+            db_manager.save_embedding(pk, sentence_embedding.cpu().numpy())
             
         except Exception as e:
             print(f"Error processing reel {pk}: {e}")